@@ -0,0 +1,88 @@
+import argparse
+import glob
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from css_parser import format_css, parse_css, parse_css_dict
+from main import SEEDS_PATH
+
+def load_corpus(patterns):
+    files = sorted({f for pattern in patterns for f in glob.glob(pattern, recursive=True)})
+    corpus = []
+    for file in files:
+        with open(file, encoding='utf-8') as f:
+            corpus.append((file, f.read()))
+    return corpus
+
+def cssutils_parse(text):
+    import cssutils
+    css_styles = {}
+    for rule in cssutils.parseString(text):
+        if rule.type == rule.STYLE_RULE:
+            css_styles[rule.selectorText] = [(d.name, d.value) for d in rule.style]
+    return css_styles
+
+def property_names(css):
+    return {''.join(selector.split()): [name for name, _ in properties] for selector, properties in css.items()}
+
+def time_parser(parse, corpus, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _, text in corpus:
+            parse(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the streaming CSS parser against cssutils")
+    parser.add_argument('patterns', nargs='*', default=[os.path.join(SEEDS_PATH, 'variants_*', 'index.css')])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.patterns)
+    if not corpus:
+        print(f"No CSS files matched {args.patterns}")
+        return
+    size = sum(len(text) for _, text in corpus)
+    print(f"{len(corpus)} files, {size / 1024:.1f} KiB")
+
+    parse_time = time_parser(parse_css, corpus, args.repeat)
+    print(f"css_parser: {parse_time * 1000:.1f} ms ({size / parse_time / 2**20:.1f} MiB/s)")
+    sheets = [parse_css(text) for _, text in corpus]
+    start = time.perf_counter()
+    for sheet in sheets:
+        format_css(sheet)
+    print(f"serialize:  {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    unstable = [file for (file, _), sheet in zip(corpus, sheets)
+                if format_css(parse_css(format_css(sheet))) != format_css(sheet)]
+    print(f"round trip: {len(corpus) - len(unstable)}/{len(corpus)} stable")
+    for file in unstable:
+        print(f"  unstable: {file}")
+
+    try:
+        import cssutils
+    except ImportError:
+        print("cssutils not installed, skipping comparison")
+        return
+    cssutils.log.setLevel(logging.CRITICAL)
+    reference_time = time_parser(cssutils_parse, corpus, args.repeat)
+    print(f"cssutils:   {reference_time * 1000:.1f} ms ({reference_time / parse_time:.1f}x slower)")
+
+    mismatched = []
+    for file, text in corpus:
+        ours = {selector: [(list(p['name'])[0], list(p['value'])[0]) for p in properties]
+                for selector, properties in parse_css_dict(text).items()}
+        if property_names(ours) != property_names(cssutils_parse(text)):
+            mismatched.append(file)
+    print(f"structure:  {len(corpus) - len(mismatched)}/{len(corpus)} files agree with cssutils")
+    for file in mismatched:
+        print(f"  differs: {file}")
+
+if __name__ == "__main__":
+    main()
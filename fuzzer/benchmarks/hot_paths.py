@@ -0,0 +1,247 @@
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from bs4 import BeautifulSoup
+from css_evaluator import CSSEvaluator
+from css_modifier import CSSModifier
+from css_rl_learner import CSSRLLearner
+from html_template import HTMLTemplate
+from resource_catalog import register_catalog
+from resource_manager import ResourceManager
+from stylesheet import compile_css
+from utils import get_css_classes
+
+SELECTOR_SIZES = [10, 100, 1000, 10000]
+ICON_SIZES = [100, 1000, 10000, 50000]
+COMPONENTS = ['button', 'card', 'chip', 'dialog', 'fab', 'menu', 'navigation', 'snackbar', 'text-field',
+              'headline', 'title', 'body', 'label', 'caption', 'icon', 'container']
+MODIFIER_OPS = [
+    ('modify_contrast', (True,)), ('modify_contrast', (False,)), ('apply_complementary_colors', ()),
+    ('randomize_colors', ()), ('modify_elevation', (True,)), ('modify_border_radius', (True,)),
+    ('modify_font_size', (True,)), ('modify_line_height', (True,)), ('modify_font_weight', (True,)),
+    ('randomize_typography', ()),
+]
+EVALUATORS = ['evaluate_color_contrast', 'evaluate_border_radius', 'evaluate_elevation', 'evaluate_typography']
+
+def synthetic_css(selectors, rng):
+    blocks = []
+    for i in range(selectors):
+        lines = [f"    color: #{rng.randrange(1 << 24):06x};",
+                 f"    background-color: #{rng.randrange(1 << 24):06x};",
+                 f"    font-size: {rng.choice([12, 14, 16, 22, 32])}px;",
+                 f"    line-height: {rng.choice([16, 20, 24, 28])}px;",
+                 f"    font-weight: {rng.choice([400, 500, 700])};",
+                 "    display: flex;"]
+        if i % 2 == 0:
+            lines.append(f"    border-radius: {rng.choice([0, 4, 8, 12, 16, 28])}px;")
+        if i % 3 == 0:
+            lines.append(f"    box-shadow: 0px {rng.randrange(1, 8)}px {rng.randrange(2, 16)}px rgba(0, 0, 0, 0.3);")
+        blocks.append(f".{COMPONENTS[i % len(COMPONENTS)]}-{i} {{\n" + "\n".join(lines) + "\n}\n")
+    return "\n".join(blocks)
+
+def synthetic_html(slots):
+    images = ''.join(f'<img src="icon_{i}.svg"/>' if i % 2 == 0 else f'<img src="image_{i}.png"/>'
+                     for i in range(slots))
+    return BeautifulSoup('<html><head><link rel="stylesheet" href="index.css"/></head>'
+                         f'<body><div>{images}</div></body></html>', 'html.parser')
+
+def synthetic_resources(root, count):
+    icon_folder = os.path.join(root, f"icons_{count}")
+    image_folder = os.path.join(root, f"images_{count}") + os.sep
+    register_catalog('icons', icon_folder, {f"icon_{i}": f"{icon_folder}/icon_{i}.svg" for i in range(count)})
+    register_catalog('images', image_folder, [f"image_{i}.png" for i in range(count)])
+    return icon_folder, image_folder
+
+def measure(func, min_time, repeat):
+    func()
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or number >= 1 << 20:
+            break
+        number *= 2 if elapsed <= 0 else max(2, min(10, int(min_time / elapsed) + 1))
+
+    timings = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) / number)
+    return {'calls': number, 'min': min(timings), 'median': statistics.median(timings)}
+
+class Suite:
+    def __init__(self, min_time, repeat, pattern=None):
+        self.min_time = min_time
+        self.repeat = repeat
+        self.pattern = pattern
+        self.results = []
+
+    def run(self, name, params, func):
+        if self.pattern and self.pattern not in name:
+            return
+        random.seed(0)
+        np.random.seed(0)
+        result = {'name': name, 'params': params, **measure(func, self.min_time, self.repeat)}
+        self.results.append(result)
+        label = ', '.join(f"{k}={v}" for k, v in params.items())
+        print(f"{name:<32} {label:<24} {format_seconds(result['median']):>12}")
+
+def format_seconds(seconds):
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('us', 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+def stylesheet_benchmarks(suite, sizes):
+    evaluator = CSSEvaluator()
+    for size in sizes:
+        text = synthetic_css(size, random.Random(size))
+        params = {'selectors': size}
+        suite.run('get_css_classes', params, lambda: get_css_classes(text))
+        css = compile_css(get_css_classes(text))
+        for name in EVALUATORS:
+            suite.run(name, params, lambda: getattr(evaluator, name)(css))
+        suite.run('evaluate_batch[8]', params, lambda: evaluator.evaluate_batch([css] * 8))
+
+        modifier = CSSModifier()
+        for name, args in MODIFIER_OPS:
+            suite.run(f"{name}{list(args) if args else ''}", params,
+                      lambda: getattr(modifier, name)(css, *args))
+
+def resource_benchmarks(suite, sizes, root):
+    template = HTMLTemplate(synthetic_html(20))
+    for size in sizes:
+        icon_folder, image_folder = synthetic_resources(root, size)
+        params = {'icons': size}
+        suite.run('ResourceManager()', params, lambda: ResourceManager(icon_folder, image_folder))
+        manager = ResourceManager(icon_folder, image_folder)
+        suite.run('select_icon', params, manager.select_icon)
+        suite.run('select_image', params, manager.select_image)
+        assignment = template.initial_assignment()
+        suite.run('assign_resources[20]', params, lambda: manager.assign_resources(template, assignment))
+
+def learner_benchmarks(suite, sizes, root):
+    for size in sizes:
+        text = synthetic_css(size, random.Random(size))
+        icon_folder, image_folder = synthetic_resources(root, 1000)
+        random.seed(0)
+        learner = CSSRLLearner(get_css_classes(text), synthetic_html(20), icon_folder, image_folder,
+                               os.path.join(root, 'learner'), size, 0.8)
+        learner.best_reward = math.inf
+        variant_dir = os.path.join(root, 'learner')
+        suite.run('CSSRLLearner.run_step', {'selectors': size}, lambda: learner.run_step(0, 0, variant_dir))
+
+def scaling(results):
+    curves = {}
+    for result in results:
+        if len(result['params']) == 1:
+            (param, size), = result['params'].items()
+            curves.setdefault((result['name'], param), []).append((size, result['median']))
+
+    exponents = {}
+    for (name, param), points in curves.items():
+        if len(points) > 1:
+            x = np.log([size for size, _ in points])
+            y = np.log([max(seconds, 1e-12) for _, seconds in points])
+            exponents[name] = {'param': param, 'exponent': float(np.polyfit(x, y, 1)[0])}
+    return exponents
+
+def result_key(result):
+    return (result['name'], tuple(sorted(result['params'].items())))
+
+def compare(results, baseline_path, threshold):
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = {result_key(r): r for r in json.load(f)['results']}
+
+    regressions = []
+    print(f"\nComparison against {baseline_path} (threshold {threshold:.2f}x)")
+    for result in results:
+        old = baseline.get(result_key(result))
+        if old is None:
+            continue
+        ratio = result['median'] / old['median'] if old['median'] > 0 else math.inf
+        flag = 'REGRESSION' if ratio > threshold else ('faster' if ratio < 1 / threshold else '')
+        label = ', '.join(f"{k}={v}" for k, v in result['params'].items())
+        print(f"{result['name']:<32} {label:<24} {ratio:>7.2f}x {flag}")
+        if ratio > threshold:
+            regressions.append({'name': result['name'], 'params': result['params'], 'ratio': ratio})
+    return regressions
+
+def metadata():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+    }
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the fuzzer hot paths across input sizes")
+    parser.add_argument('--selectors', type=int, nargs='+', default=SELECTOR_SIZES)
+    parser.add_argument('--icons', type=int, nargs='+', default=ICON_SIZES)
+    parser.add_argument('--quick', action='store_true', help="only the two smallest sizes of each axis")
+    parser.add_argument('--filter', help="only run benchmarks whose name contains this string")
+    parser.add_argument('--min-time', type=float, default=0.2)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--baseline', help="results file to compare against")
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help="flag benchmarks whose median time grew by more than this factor")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    selectors, icons = args.selectors, args.icons
+    if args.quick:
+        selectors, icons = sorted(selectors)[:2], sorted(icons)[:2]
+
+    suite = Suite(args.min_time, args.repeat, args.filter)
+    with tempfile.TemporaryDirectory() as root:
+        stylesheet_benchmarks(suite, selectors)
+        resource_benchmarks(suite, icons, root)
+        learner_benchmarks(suite, selectors, root)
+
+    exponents = scaling(suite.results)
+    if exponents:
+        print("\nScaling exponents (time ~ size^k)")
+        for name, curve in exponents.items():
+            print(f"{name:<32} {curve['param']:<10} k={curve['exponent']:.2f}")
+
+    report = {'meta': metadata(), 'results': suite.results, 'scaling': exponents}
+    regressions = []
+    if args.baseline:
+        regressions = compare(suite.results, args.baseline, args.threshold)
+        report['baseline'] = {'path': args.baseline, 'threshold': args.threshold, 'regressions': regressions}
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {len(suite.results)} results to {args.output}")
+    if regressions:
+        print(f"{len(regressions)} regression(s) above {args.threshold:.2f}x")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
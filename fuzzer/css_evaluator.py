@@ -1,32 +1,81 @@
-import colorsys
 import re
-import math
+import numpy as np
+from collections import defaultdict
+from colors import INVALID, contrast_ratio, contrast_ratios, hex_to_rgb, luminance, relative_luminance, rgb_to_hex
+from stylesheet import *
 
-class CSSEvaluator:
-    @staticmethod
-    def hex_to_rgb(hex_color):
-        hex_color = hex_color.lstrip('#')
-        if len(hex_color) == 3:
-            hex_color = ''.join([c*2 for c in hex_color])
-        return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+class GuidelineTable:
+    def __init__(self, rules, default):
+        self.default = default
+        self.values = [value for _, value in rules]
+        self.ranks = {}
+        for rank, (keywords, _) in enumerate(rules):
+            for keyword in keywords:
+                self.ranks.setdefault(keyword, rank)
+        ordered = sorted(self.ranks, key=self.ranks.get)
+        self.pattern = re.compile('(?=(' + '|'.join(re.escape(k) for k in ordered) + '))')
+        self.memo = {}
 
-    @staticmethod
-    def rgb_to_hex(rgb):
-        return f'#{rgb[0]:02x}{rgb[1]:02x}{rgb[2]:02x}'
+    def lookup(self, selector):
+        value = self.memo.get(selector)
+        if value is None:
+            ranks = [self.ranks[m.group(1)] for m in self.pattern.finditer(selector.lower())]
+            value = self.values[min(ranks)] if ranks else self.default
+            self.memo[selector] = value
+        return value
 
-    @staticmethod
-    def get_relative_luminance(color):
-        r, g, b = CSSEvaluator.hex_to_rgb(color)
-        r, g, b = r/255, g/255, b/255
-        return 0.2126 * r + 0.7152 * g + 0.0722 * b
 
-    @staticmethod
-    def calculate_contrast_ratio(color1, color2):
-        l1 = CSSEvaluator.get_relative_luminance(color1)
-        l2 = CSSEvaluator.get_relative_luminance(color2)
-        lighter = max(l1, l2)
-        darker = min(l1, l2)
-        return (lighter + 0.05) / (darker + 0.05)
+RADIUS_GUIDELINES = GuidelineTable([
+    (['fab', 'extended-fab'], 28),
+    (['bottom-sheet', 'side-sheet', 'navigation-drawer-modal'], 16),
+    (['card', 'dialog'], 12),
+    (['bottom-sheet-header', 'navigation-drawer'], 8),
+    (['chip', 'helper', 'menu', 'tooltip-light', 'snackbar'], 4),
+    (['time-picker', 'menu-item', 'tooltip-dark'], 0),
+], 4)
+
+ELEVATION_GUIDELINES = GuidelineTable([
+    (['fab', 'datepicker', 'dialog', 'search', 'timepicker'], 6),
+    (['bottomappbar', 'dropdown', 'menu', 'navigationbar', 'topappbar', 'tooltip'], 3),
+    (['chip', 'banner', 'sheet', 'elevated', 'lowered', 'slider-handle'], 1),
+], 0)
+
+FONT_SIZE_GUIDELINES = GuidelineTable([
+    (['h1', 'headline1', 'headline-large'], 32),
+    (['h2', 'headline2', 'headline-medium'], 28),
+    (['h3', 'headline3', 'headline-small'], 24),
+    (['h4', 'title1', 'title-large'], 22),
+    (['h5', 'title2', 'title-medium'], 16),
+    (['h6', 'title3', 'title-small'], 14),
+    (['body1', 'body-large'], 16),
+    (['body2', 'body-medium'], 14),
+    (['caption', 'label-small'], 12),
+    (['overline', 'label-medium'], 11),
+], 14)
+
+FONT_WEIGHT_GUIDELINES = GuidelineTable([
+    (['h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'headline', 'title'], 500),
+    (['button', 'btn'], 500),
+    (['overline', 'caption'], 400),
+], 400)
+
+
+class SelectorGuidelines:
+    def __init__(self, selectors):
+        self.radius = np.array([RADIUS_GUIDELINES.lookup(s) for s in selectors], dtype=np.float64)
+        self.elevation = np.array([ELEVATION_GUIDELINES.lookup(s) for s in selectors], dtype=np.float64)
+        self.font_size = np.array([FONT_SIZE_GUIDELINES.lookup(s) for s in selectors], dtype=np.float64)
+        self.font_weight = np.array([FONT_WEIGHT_GUIDELINES.lookup(s) for s in selectors], dtype=np.float64)
+
+
+class CSSEvaluator:
+    def __init__(self):
+        self.cache = None
+
+    hex_to_rgb = staticmethod(hex_to_rgb)
+    rgb_to_hex = staticmethod(rgb_to_hex)
+    get_relative_luminance = staticmethod(relative_luminance)
+    calculate_contrast_ratio = staticmethod(contrast_ratio)
 
     @staticmethod
     def extract_number(value):
@@ -35,211 +84,252 @@ class CSSEvaluator:
         except:
             return 0.0
 
+    relative_luminance = staticmethod(luminance)
+    contrast_ratios = staticmethod(contrast_ratios)
+
+    @staticmethod
+    def tiered_score(deviation, limits, tiers, floor):
+        conditions = [deviation <= limit for limit in limits]
+        return np.select(conditions, tiers, default=np.maximum(floor, np.exp(-deviation)))
+
+    @staticmethod
+    def mean_score(scores):
+        return float(np.mean(scores)) if len(scores) else 0.5
+
+    @staticmethod
+    def expected_radius(selector):
+        return RADIUS_GUIDELINES.lookup(selector)
+
+    @staticmethod
+    def expected_elevation(selector):
+        return ELEVATION_GUIDELINES.lookup(selector)
+
+    @staticmethod
+    def expected_font_size(selector):
+        return FONT_SIZE_GUIDELINES.lookup(selector)
+
+    @staticmethod
+    def expected_font_weight(selector):
+        return FONT_WEIGHT_GUIDELINES.lookup(selector)
+
+    def guidelines(self, layout):
+        record = layout.cache.get('guidelines')
+        if record is None:
+            record = layout.cache['guidelines'] = SelectorGuidelines(layout.selectors)
+        return record
+
+    def pair_contrasts(self, css):
+        contrast, valid = self.contrast_values(css, slice(None))
+        return contrast[valid], css.layout.pair_selectors[valid]
+
+    def contrast_values(self, css, pairs):
+        layout = css.layout
+        return self.pair_contrast_values(css.column(COLOR).data, css.column(BACKGROUND_COLOR).data,
+                                         layout.pair_fg[pairs], layout.pair_bg[pairs])
+
+    def pair_contrast_values(self, fg_data, bg_data, fg_entries, bg_entries):
+        fg = np.take(fg_data, fg_entries, axis=-1)
+        bg = np.take(bg_data, bg_entries, axis=-1)
+        valid = (fg != INVALID) & (bg != INVALID)
+        return self.contrast_ratios(fg, bg), valid
+
+    def contrast_tiers(self, contrast):
+        return np.select([contrast >= 7.0, contrast >= 4.5, contrast >= 3.0], [1.0, 0.8, 0.6], default=0.2)
+
+    def radius_tiers(self, deviation):
+        return self.tiered_score(deviation, [0, 2, 4, 8], [1.0, 0.8, 0.6, 0.3], 0.1)
+
+    def elevation_tiers(self, deviation):
+        return self.tiered_score(deviation, [0.5, 1, 2, 3], [1.0, 0.8, 0.5, 0.2], 0.1)
+
+    def typography_tiers(self, font_size, line_height, font_weight, expected_size, expected_weight):
+        size_deviation = np.abs(font_size - expected_size)
+        lh_deviation = np.abs(line_height - font_size * 1.5)
+        weight_deviation = np.abs(font_weight - expected_weight)
+        scores = np.stack([
+            self.tiered_score(size_deviation, [1, 2, 4], [1.0, 0.8, 0.6], 0.2),
+            self.tiered_score(lh_deviation, [2, 4, 6], [1.0, 0.8, 0.6], 0.2),
+            self.tiered_score(weight_deviation, [50, 100, 200], [1.0, 0.8, 0.6], 0.2),
+        ], axis=-1)
+        valid = np.stack([font_size != 0, (line_height != 0) & (font_size != 0), font_weight != 0], axis=-1)
+        return scores, valid
+
+    @staticmethod
+    def last_values(layout, family, data, selectors):
+        last = layout.last_entry[family][selectors]
+        present = last >= 0
+        values = np.zeros(data.shape[:-1] + (len(last),))
+        values[..., present] = data[..., last[present]]
+        return values
+
+    def contrast_scores(self, css, pairs):
+        contrast, valid = self.contrast_values(css, pairs)
+        return self.contrast_tiers(contrast), valid
+
+    def radius_scores(self, css, positions, expected_radius):
+        deviation = np.abs(css.column(BORDER_RADIUS).data[positions] - expected_radius)
+        scores = self.radius_tiers(deviation)
+        return scores, np.ones(len(scores), dtype=bool)
+
+    def elevation_scores(self, css, positions, expected_dp):
+        current_dp = css.column(BOX_SHADOW).data[positions, SHADOW_ELEVATION]
+        scores = self.elevation_tiers(np.abs(current_dp - expected_dp))
+        return scores, np.ones(len(scores), dtype=bool)
+
+    def typography_scores(self, css, selectors, expected_size, expected_weight):
+        font_size, line_height, font_weight = [
+            self.last_values(css.layout, family, css.column(family).data, selectors)
+            for family in (FONT_SIZE, LINE_HEIGHT, FONT_WEIGHT)]
+        return self.typography_tiers(font_size, line_height, font_weight, expected_size, expected_weight)
+
+    def typography_expectations(self, css):
+        record = self.guidelines(css.layout)
+        return record.font_size, record.font_weight
+
     def evaluate_color_contrast(self, css):
-        scores = []
-        for selector, properties in css.items():
-            bg_color = None
-            fg_color = None
-            for prop in properties:
-                if 'color' in prop['name']:
-                    fg_color = list(prop['value'])[0]
-                elif 'background-color' in prop['name']:
-                    bg_color = list(prop['value'])[0]
-            
-            if bg_color and fg_color and bg_color.startswith('#') and fg_color.startswith('#'):
-                contrast = self.calculate_contrast_ratio(bg_color, fg_color)
-                if contrast >= 7.0:
-                    scores.append(1.0)
-                elif contrast >= 4.5:
-                    scores.append(0.8)
-                elif contrast >= 3.0:
-                    scores.append(0.6)
-                else:
-                    scores.append(0.2)
-        
-        return sum(scores) / len(scores) if scores else 0.5
+        css = compile_css(css)
+        scores, valid = self.contrast_scores(css, slice(None))
+        return self.mean_score(scores[valid])
 
     def evaluate_border_radius(self, css):
-        def get_expected_radius(selector):
-            selector = selector.lower()
-            if any(x in selector for x in ['fab', 'extended-fab']):
-                return 28
-            elif any(x in selector for x in ['bottom-sheet', 'side-sheet', 'navigation-drawer-modal']):
-                return 16
-            elif any(x in selector for x in ['card', 'dialog']):
-                return 12
-            elif any(x in selector for x in ['bottom-sheet-header', 'navigation-drawer']):
-                return 8
-            elif any(x in selector for x in ['chip', 'helper', 'menu', 'tooltip-light', 'snackbar']):
-                return 4
-            elif any(x in selector for x in ['time-picker', 'menu-item', 'tooltip-dark']):
-                return 0
-            return 4
-            
-        scores = []
-        for selector, properties in css.items():
-            for prop in properties:
-                if 'border-radius' in prop['name']:
-                    radius = self.extract_number(list(prop['value'])[0])
-                    expected_radius = get_expected_radius(selector)
-                    deviation = abs(radius - expected_radius)
-                    
-                    if deviation == 0:
-                        score = 1.0
-                    elif deviation <= 2:
-                        score = 0.8
-                    elif deviation <= 4:
-                        score = 0.6
-                    elif deviation <= 8:
-                        score = 0.3
-                    else:
-                        score = max(0.1, math.exp(-deviation))
-                    
-                    scores.append(score)
-        
-        return sum(scores) / len(scores) if scores else 0.5
+        css = compile_css(css)
+        expected_radius = self.guidelines(css.layout).radius[css.layout.entry_selectors[BORDER_RADIUS]]
+        scores, _ = self.radius_scores(css, slice(None), expected_radius)
+        return self.mean_score(scores)
 
     def evaluate_elevation(self, css):
-        def get_elevation_dp(shadow_value):
-            if not shadow_value:
-                return 0
-            numbers = [float(n) for n in re.findall(r'-?\d*\.?\d+', shadow_value)]
-            return max(numbers) if numbers else 0
-            
-        def get_expected_elevation(selector):
-            selector = selector.lower()
-            if any(x in selector for x in ['fab', 'datepicker', 'dialog', 'search', 'timepicker']):
-                return 6
-            elif any(x in selector for x in ['bottomappbar', 'dropdown', 'menu', 'navigationbar', 
-                                        'topappbar', 'tooltip']):
-                return 3
-            elif any(x in selector for x in ['chip', 'banner', 'sheet', 'elevated', 'lowered', 
-                                        'slider-handle']):
-                return 1
-            return 0
-
-        scores = []
-        for selector, properties in css.items():
-            for prop in properties:
-                if 'box-shadow' in prop['name']:
-                    shadow_value = list(prop['value'])[0]
-                    current_dp = get_elevation_dp(shadow_value)
-                    expected_dp = get_expected_elevation(selector)
-                    deviation = abs(current_dp - expected_dp)
-                    
-                    if deviation <= 0.5:
-                        score = 1.0
-                    elif deviation <= 1:
-                        score = 0.8
-                    elif deviation <= 2:
-                        score = 0.5
-                    elif deviation <= 3:
-                        score = 0.2
-                    else:
-                        score = max(0.1, math.exp(-deviation))
-                    
-                    scores.append(score)
-        
-        return sum(scores) / len(scores) if scores else 0.5
+        css = compile_css(css)
+        expected_dp = self.guidelines(css.layout).elevation[css.layout.entry_selectors[BOX_SHADOW]]
+        scores, _ = self.elevation_scores(css, slice(None), expected_dp)
+        return self.mean_score(scores)
 
     def evaluate_typography(self, css):
-        def get_expected_font_size(selector):
-            selector = selector.lower()
-            if any(x in selector for x in ['h1', 'headline1', 'headline-large']):
-                return 32
-            elif any(x in selector for x in ['h2', 'headline2', 'headline-medium']):
-                return 28
-            elif any(x in selector for x in ['h3', 'headline3', 'headline-small']):
-                return 24
-            elif any(x in selector for x in ['h4', 'title1', 'title-large']):
-                return 22
-            elif any(x in selector for x in ['h5', 'title2', 'title-medium']):
-                return 16
-            elif any(x in selector for x in ['h6', 'title3', 'title-small']):
-                return 14
-            elif any(x in selector for x in ['body1', 'body-large']):
-                return 16
-            elif any(x in selector for x in ['body2', 'body-medium']):
-                return 14
-            elif any(x in selector for x in ['caption', 'label-small']):
-                return 12
-            elif any(x in selector for x in ['overline', 'label-medium']):
-                return 11
-            return 14
-
-        def get_expected_line_height(font_size):
-            return font_size * 1.5
-
-        def get_expected_font_weight(selector):
-            selector = selector.lower()
-            if any(x in selector for x in ['h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'headline', 'title']):
-                return 500
-            elif any(x in selector for x in ['button', 'btn']):
-                return 500
-            elif any(x in selector for x in ['overline', 'caption']):
-                return 400
-            return 400
-
-        scores = []
-        for selector, properties in css.items():
-            font_size = None
-            line_height = None
-            font_weight = None
-            
-            for prop in properties:
-                prop_name = list(prop['name'])[0]
-                prop_value = list(prop['value'])[0]
-                
-                if prop_name == 'font-size':
-                    font_size = self.extract_number(prop_value)
-                elif prop_name == 'line-height':
-                    line_height = self.extract_number(prop_value)
-                elif prop_name == 'font-weight':
-                    font_weight = self.extract_number(prop_value)
-            
-            if font_size:
-                expected_size = get_expected_font_size(selector)
-                size_deviation = abs(font_size - expected_size)
-                
-                if size_deviation <= 1:
-                    size_score = 1.0
-                elif size_deviation <= 2:
-                    size_score = 0.8
-                elif size_deviation <= 4:
-                    size_score = 0.6
-                else:
-                    size_score = max(0.2, math.exp(-size_deviation))
-                
-                scores.append(size_score)
-            
-            if line_height and font_size:
-                expected_lh = get_expected_line_height(font_size)
-                lh_deviation = abs(line_height - expected_lh)
-                
-                if lh_deviation <= 2:
-                    lh_score = 1.0
-                elif lh_deviation <= 4:
-                    lh_score = 0.8
-                elif lh_deviation <= 6:
-                    lh_score = 0.6
-                else:
-                    lh_score = max(0.2, math.exp(-lh_deviation))
-                
-                scores.append(lh_score)
-            
-            if font_weight:
-                expected_weight = get_expected_font_weight(selector)
-                weight_deviation = abs(font_weight - expected_weight)
-                
-                if weight_deviation <= 50:
-                    weight_score = 1.0
-                elif weight_deviation <= 100:
-                    weight_score = 0.8
-                elif weight_deviation <= 200:
-                    weight_score = 0.6
-                else:
-                    weight_score = max(0.2, math.exp(-weight_deviation))
-                
-                scores.append(weight_score)
-        
-        return sum(scores) / len(scores) if scores else 0.5
\ No newline at end of file
+        css = compile_css(css)
+        selectors = np.arange(len(css.layout.selectors))
+        scores, valid = self.typography_scores(css, selectors, *self.typography_expectations(css))
+        return self.mean_score(scores.T[valid.T])
+
+    @staticmethod
+    def batch_mean(scores, valid):
+        axes = tuple(range(1, scores.ndim))
+        count = valid.sum(axis=axes)
+        total = np.where(valid, scores, 0.0).sum(axis=axes)
+        return np.where(count > 0, total / np.maximum(count, 1), 0.5)
+
+    def evaluate_batch(self, sheets):
+        """Score many stylesheets with array operations across candidates x selectors.
+
+        Returns an array of shape (len(sheets), 4) holding the contrast, border radius,
+        elevation and typography scores of each sheet, in the order of the evaluate_*
+        methods. Sheets compiled from the same seed share one layout and are scored
+        together. Scores agree with the scalar methods to within 1e-9; only the order
+        of the floating point sums differs.
+        """
+        sheets = [compile_css(css) for css in sheets]
+        results = np.full((len(sheets), 4), 0.5)
+        groups = defaultdict(list)
+        for index, css in enumerate(sheets):
+            groups[id(css.layout)].append(index)
+
+        for indices in groups.values():
+            layout = sheets[indices[0]].layout
+            data = {family: np.stack([sheets[i].column(family).data for i in indices]) for family in FAMILIES}
+
+            contrast, valid = self.pair_contrast_values(data[COLOR], data[BACKGROUND_COLOR],
+                                                        layout.pair_fg, layout.pair_bg)
+            results[indices, 0] = self.batch_mean(self.contrast_tiers(contrast), valid)
+
+            record = self.guidelines(layout)
+            expected_radius = record.radius[layout.entry_selectors[BORDER_RADIUS]]
+            scores = self.radius_tiers(np.abs(data[BORDER_RADIUS] - expected_radius))
+            results[indices, 1] = self.batch_mean(scores, np.ones(scores.shape, dtype=bool))
+
+            expected_dp = record.elevation[layout.entry_selectors[BOX_SHADOW]]
+            scores = self.elevation_tiers(np.abs(data[BOX_SHADOW][..., SHADOW_ELEVATION] - expected_dp))
+            results[indices, 2] = self.batch_mean(scores, np.ones(scores.shape, dtype=bool))
+
+            selectors = np.arange(len(layout.selectors))
+            scores, valid = self.typography_tiers(
+                *[self.last_values(layout, family, data[family], selectors)
+                  for family in (FONT_SIZE, LINE_HEIGHT, FONT_WEIGHT)],
+                record.font_size, record.font_weight)
+            results[indices, 3] = self.batch_mean(scores, valid)
+
+        return results
+
+    def reset_cache(self):
+        self.cache = None
+
+    def evaluate_guidelines(self, css):
+        css = compile_css(css)
+        cache = self.cache
+        if cache is None or cache.layout is not css.layout or cache.origin != css.origin:
+            cache = self.cache = GuidelineCache(self, css)
+        else:
+            cache.update(css)
+        cache.origin = css.mark_clean()
+        return cache.scores()
+
+
+class CriterionCache:
+    def __init__(self, scores, valid):
+        self.scores = scores
+        self.valid = valid
+        self.total = float(scores[valid].sum())
+        self.count = int(valid.sum())
+
+    def update(self, index, scores, valid):
+        self.total += float(scores[valid].sum()) - float(self.scores[index][self.valid[index]].sum())
+        self.count += int(valid.sum()) - int(self.valid[index].sum())
+        self.scores[index] = scores
+        self.valid[index] = valid
+
+    def mean(self):
+        return self.total / self.count if self.count else 0.5
+
+
+class GuidelineCache:
+    def __init__(self, evaluator, css):
+        self.evaluator = evaluator
+        self.layout = css.layout
+        self.origin = css.origin
+        layout = css.layout
+        record = evaluator.guidelines(layout)
+        self.expected_radius = record.radius[layout.entry_selectors[BORDER_RADIUS]]
+        self.expected_dp = record.elevation[layout.entry_selectors[BOX_SHADOW]]
+        self.expected_size, self.expected_weight = record.font_size, record.font_weight
+
+        everything = slice(None)
+        self.contrast = CriterionCache(*evaluator.contrast_scores(css, everything))
+        self.radius = CriterionCache(*evaluator.radius_scores(css, everything, self.expected_radius))
+        self.elevation = CriterionCache(*evaluator.elevation_scores(css, everything, self.expected_dp))
+        self.typography = CriterionCache(*evaluator.typography_scores(
+            css, np.arange(len(layout.selectors)), self.expected_size, self.expected_weight))
+
+    def update(self, css):
+        evaluator = self.evaluator
+        layout = self.layout
+
+        pairs = np.unique(np.concatenate([
+            layout.entry_pairs[family][css.changed_positions(family)] for family in COLOR_FAMILIES]))
+        pairs = pairs[pairs >= 0]
+        if len(pairs):
+            self.contrast.update(pairs, *evaluator.contrast_scores(css, pairs))
+
+        positions = css.changed_positions(BORDER_RADIUS)
+        if len(positions):
+            self.radius.update(positions, *evaluator.radius_scores(css, positions, self.expected_radius[positions]))
+
+        positions = css.changed_positions(BOX_SHADOW)
+        if len(positions):
+            self.elevation.update(positions, *evaluator.elevation_scores(css, positions, self.expected_dp[positions]))
+
+        selectors = np.unique(np.concatenate([
+            layout.entry_selectors[family][css.changed_positions(family)]
+            for family in (FONT_SIZE, LINE_HEIGHT, FONT_WEIGHT)]))
+        if len(selectors):
+            self.typography.update(selectors, *evaluator.typography_scores(
+                css, selectors, self.expected_size[selectors], self.expected_weight[selectors]))
+
+    def scores(self):
+        return (self.contrast.mean(), self.radius.mean(), self.elevation.mean(), self.typography.mean())
@@ -1,193 +1,174 @@
 import random
-import colorsys
-import re
+import numpy as np
 from collections import defaultdict
+from colors import INVALID, format_colors, hex_to_rgb, hsv_to_packed, packed_to_hsv, rgb_to_hex
+from stylesheet import *
+from utils import RollingHistory
 
 class CSSModifier:
-    def __init__(self):
-        self.color_history = []
-        self.size_history = []
-        self.radius_history = []
-        self.shadow_history = []
-        self.font_size_history = []
-        self.line_height_history = []
-        self.font_weight_history = []
+    def __init__(self, history_window=50):
+        self.color_history = RollingHistory(history_window)
+        self.size_history = RollingHistory(history_window)
+        self.radius_history = RollingHistory(history_window)
+        self.shadow_history = RollingHistory(history_window)
+        self.font_size_history = RollingHistory(history_window)
+        self.line_height_history = RollingHistory(history_window)
+        self.font_weight_history = RollingHistory(history_window)
         self.previous_values = defaultdict(dict)
 
     def modify_contrast(self, css, increase):
-        new_css = css.copy()
-        for selector, properties in new_css.items():
-            bg_color = None
-            fg_color = None
-            
-            for prop in properties:
-                if 'color' in prop['name']:
-                    fg_color = list(prop['value'])[0]
-                elif 'background-color' in prop['name']:
-                    bg_color = list(prop['value'])[0]
-            
-            if bg_color and fg_color and bg_color.startswith('#') and fg_color.startswith('#'):
-                bg_rgb = self.hex_to_rgb(bg_color)
-                fg_rgb = self.hex_to_rgb(fg_color)
-                bg_hsv = colorsys.rgb_to_hsv(*[x/255 for x in bg_rgb])
-                fg_hsv = colorsys.rgb_to_hsv(*[x/255 for x in fg_rgb])
-                
-                if increase:
-                    if bg_hsv[2] > fg_hsv[2]:
-                        bg_hsv = (bg_hsv[0], bg_hsv[1], min(1.0, bg_hsv[2] * 1.2))
-                        fg_hsv = (fg_hsv[0], fg_hsv[1], max(0.0, fg_hsv[2] * 0.8))
-                    else:
-                        bg_hsv = (bg_hsv[0], bg_hsv[1], max(0.0, bg_hsv[2] * 0.8))
-                        fg_hsv = (fg_hsv[0], fg_hsv[1], min(1.0, fg_hsv[2] * 1.2))
-                else:
-                    bg_hsv = (bg_hsv[0], bg_hsv[1], (bg_hsv[2] + 0.5) / 2)
-                    fg_hsv = (fg_hsv[0], fg_hsv[1], (fg_hsv[2] + 0.5) / 2)
-                
-                bg_rgb = [int(x * 255) for x in colorsys.hsv_to_rgb(*bg_hsv)]
-                fg_rgb = [int(x * 255) for x in colorsys.hsv_to_rgb(*fg_hsv)]
-                
-                for prop in properties:
-                    if 'color' in prop['name']:
-                        new_color = self.rgb_to_hex(tuple(fg_rgb))
-                        prop['value'] = {new_color}
-                        self.color_history.append(new_color)
-                    elif 'background-color' in prop['name']:
-                        new_color = self.rgb_to_hex(tuple(bg_rgb))
-                        prop['value'] = {new_color}
-                        self.color_history.append(new_color)
-        
+        new_css = compile_css(css).copy()
+        layout = new_css.layout
+        fg = new_css.column(COLOR).data[layout.pair_fg]
+        bg = new_css.column(BACKGROUND_COLOR).data[layout.pair_bg]
+        pairs = np.flatnonzero((fg != INVALID) & (bg != INVALID))
+
+        bg_hsv = packed_to_hsv(bg[pairs])
+        fg_hsv = packed_to_hsv(fg[pairs])
+        if increase:
+            lighter_bg = bg_hsv[:, 2] > fg_hsv[:, 2]
+            bg_hsv[:, 2] = np.where(lighter_bg, np.minimum(1.0, bg_hsv[:, 2] * 1.2), np.maximum(0.0, bg_hsv[:, 2] * 0.8))
+            fg_hsv[:, 2] = np.where(lighter_bg, np.maximum(0.0, fg_hsv[:, 2] * 0.8), np.minimum(1.0, fg_hsv[:, 2] * 1.2))
+        else:
+            bg_hsv[:, 2] = (bg_hsv[:, 2] + 0.5) / 2
+            fg_hsv[:, 2] = (fg_hsv[:, 2] + 0.5) / 2
+
+        new_colors = {COLOR: np.full(len(fg), INVALID, dtype=np.int64),
+                      BACKGROUND_COLOR: np.full(len(bg), INVALID, dtype=np.int64)}
+        new_colors[COLOR][pairs] = hsv_to_packed(fg_hsv)
+        new_colors[BACKGROUND_COLOR][pairs] = hsv_to_packed(bg_hsv)
+
+        changes = []
+        for family in COLOR_FAMILIES:
+            entry_pairs = layout.entry_pairs[family]
+            positions = np.flatnonzero(np.isin(entry_pairs, pairs))
+            packed = new_colors[family][entry_pairs[positions]]
+            values = format_colors(packed)
+            new_css.update(family, positions, values, packed)
+            changes.append((layout.rows[family][positions], values))
+
+        self.record(self.color_history, changes)
         return new_css
 
-    def hex_to_rgb(self, hex_color):
-        hex_color = hex_color.lstrip('#')
-        if len(hex_color) == 3:
-            hex_color = ''.join([c*2 for c in hex_color])
-        return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+    hex_to_rgb = staticmethod(hex_to_rgb)
+    rgb_to_hex = staticmethod(rgb_to_hex)
 
-    def rgb_to_hex(self, rgb):
-        return f'#{rgb[0]:02x}{rgb[1]:02x}{rgb[2]:02x}'
+    def record(self, history, changes):
+        rows = np.concatenate([rows for rows, _ in changes])
+        values = [value for _, family_values in changes for value in family_values]
+        history.extend(values[i] for i in np.argsort(rows, kind='stable'))
 
     def apply_complementary_colors(self, css):
-        new_css = css.copy()
-        for selector, properties in new_css.items():
-            for prop in properties:
-                if ('color' in prop['name'] or 'background-color' in prop['name']) and \
-                list(prop['value'])[0].startswith('#'):
-                    color = list(prop['value'])[0]
-                    rgb = self.hex_to_rgb(color)
-                    hsv = colorsys.rgb_to_hsv(*[x/255 for x in rgb])
-                    comp_hsv = ((hsv[0] + 0.5) % 1.0, hsv[1], hsv[2])
-                    comp_rgb = [int(x * 255) for x in colorsys.hsv_to_rgb(*comp_hsv)]
-                    new_color = self.rgb_to_hex(tuple(comp_rgb))
-                    prop['value'] = {new_color}
-                    self.color_history.append(new_color)
-        
+        new_css = compile_css(css).copy()
+        changes = []
+        for family in COLOR_FAMILIES:
+            data = new_css.column(family).data
+            positions = np.flatnonzero(data != INVALID)
+            hsv = packed_to_hsv(data[positions])
+            hsv[:, 0] = np.remainder(hsv[:, 0] + 0.5, 1.0)
+            packed = hsv_to_packed(hsv)
+            values = format_colors(packed)
+            new_css.update(family, positions, values, packed)
+            changes.append((new_css.layout.rows[family][positions], values))
+
+        self.record(self.color_history, changes)
         return new_css
 
     def randomize_colors(self, css):
-        new_css = css.copy()
-        for selector, properties in new_css.items():
-            for prop in properties:
-                if ('color' in prop['name'] or 'background-color' in prop['name']):
-                    h = random.random()
-                    s = random.uniform(0.3, 0.7)
-                    v = random.uniform(0.3, 0.9)
-                    rgb = [int(x * 255) for x in colorsys.hsv_to_rgb(h, s, v)]
-                    new_color = self.rgb_to_hex(tuple(rgb))
-                    prop['value'] = {new_color}
-                    self.color_history.append(new_color)
+        new_css = compile_css(css).copy()
+        rows = np.concatenate([new_css.layout.rows[family] for family in COLOR_FAMILIES])
+        hsv = np.empty((len(rows), 3))
+        for i in np.argsort(rows, kind='stable'):
+            hsv[i] = random.random(), random.uniform(0.3, 0.7), random.uniform(0.3, 0.9)
+        packed = hsv_to_packed(hsv)
+
+        changes = []
+        offset = 0
+        for family in COLOR_FAMILIES:
+            count = len(new_css.column(family))
+            family_colors = packed[offset:offset + count]
+            values = format_colors(family_colors)
+            new_css.update(family, np.arange(count), values, family_colors)
+            changes.append((new_css.layout.rows[family], values))
+            offset += count
+
+        self.record(self.color_history, changes)
         return new_css
 
     def modify_elevation(self, css, increase):
-        new_css = css.copy()
-        for properties in new_css.values():
-            for prop in properties:
-                if 'box-shadow' in prop['name']:
-                    shadow = list(prop['value'])[0]
-                    numbers = [float(n) for n in re.findall(r'-?\d+\.?\d*', shadow)]
-                    if numbers:
-                        factor = 1.2 if increase else 0.8
-                        new_numbers = [n * factor for n in numbers]
-                        new_shadow = f"{int(new_numbers[0])}px {int(new_numbers[1])}px {int(new_numbers[2])}px"
-                        prop['value'] = {new_shadow}
-                        self.shadow_history.append(new_shadow)
+        new_css = compile_css(css).copy()
+        data = new_css.column(BOX_SHADOW).data
+        positions = np.flatnonzero(~np.isnan(data[:, SHADOW_X]))
+        factor = 1.2 if increase else 0.8
+        offsets = np.trunc(data[positions, :SHADOW_ELEVATION] * factor)
+        values = [f"{int(x)}px {int(y)}px {int(blur)}px" for x, y, blur in offsets]
+        new_data = np.column_stack([offsets, offsets.max(axis=1)])
+        new_css.update(BOX_SHADOW, positions, values, new_data)
+        self.shadow_history.extend(values)
         return new_css
 
     def modify_border_radius(self, css, increase):
-        new_css = css.copy()
-        for properties in new_css.values():
-            for prop in properties:
-                if 'border-radius' in prop['name']:
-                    radius = self.extract_number(list(prop['value'])[0])
-                    if radius:
-                        new_radius = radius * (1.2 if increase else 0.8)
-                        new_value = f"{int(new_radius)}px"
-                        prop['value'] = {new_value}
-                        self.radius_history.append(str(int(new_radius)))
+        new_css = compile_css(css).copy()
+        radius = new_css.column(BORDER_RADIUS).data
+        positions = np.flatnonzero(radius)
+        new_radius = np.trunc(radius[positions] * (1.2 if increase else 0.8))
+        new_css.update(BORDER_RADIUS, positions, [f"{int(r)}px" for r in new_radius], new_radius)
+        self.radius_history.extend(str(int(r)) for r in new_radius)
         return new_css
 
     def modify_font_size(self, css, increase):
-        new_css = css.copy()
-        for properties in new_css.values():
-            for prop in properties:
-                if 'font-size' in prop['name']:
-                    size = self.extract_number(list(prop['value'])[0])
-                    if size:
-                        new_size = size * (1.1 if increase else 0.9)
-                        new_value = f"{int(new_size)}px"
-                        prop['value'] = {new_value}
-                        self.font_size_history.append(str(int(new_size)))
+        new_css = compile_css(css).copy()
+        size = new_css.column(FONT_SIZE).data
+        positions = np.flatnonzero(size)
+        new_size = np.trunc(size[positions] * (1.1 if increase else 0.9))
+        new_css.update(FONT_SIZE, positions, [f"{int(s)}px" for s in new_size], new_size)
+        self.font_size_history.extend(str(int(s)) for s in new_size)
         return new_css
 
     def modify_line_height(self, css, increase):
-        new_css = css.copy()
-        for properties in new_css.values():
-            for prop in properties:
-                if 'line-height' in prop['name']:
-                    height = self.extract_number(list(prop['value'])[0])
-                    if height:
-                        new_height = height * (1.1 if increase else 0.9)
-                        new_value = f"{new_height:.1f}"
-                        prop['value'] = {new_value}
-                        self.line_height_history.append(str(new_height))
+        new_css = compile_css(css).copy()
+        height = new_css.column(LINE_HEIGHT).data
+        positions = np.flatnonzero(height)
+        new_height = height[positions] * (1.1 if increase else 0.9)
+        new_css.update(LINE_HEIGHT, positions, [f"{h:.1f}" for h in new_height])
+        self.line_height_history.extend(str(h) for h in new_height.tolist())
         return new_css
 
     def modify_font_weight(self, css, increase):
-        new_css = css.copy()
-        for properties in new_css.values():
-            for prop in properties:
-                if 'font-weight' in prop['name']:
-                    weight = self.extract_number(list(prop['value'])[0])
-                    if weight:
-                        if increase:
-                            new_weight = min(900, weight + 100)
-                        else:
-                            new_weight = max(100, weight - 100)
-                        new_value = str(int(new_weight))
-                        prop['value'] = {new_value}
-                        self.font_weight_history.append(new_value)
+        new_css = compile_css(css).copy()
+        weight = new_css.column(FONT_WEIGHT).data
+        positions = np.flatnonzero(weight)
+        if increase:
+            new_weight = np.minimum(900, weight[positions] + 100)
+        else:
+            new_weight = np.maximum(100, weight[positions] - 100)
+        new_weight = np.trunc(new_weight)
+        values = [str(int(w)) for w in new_weight]
+        new_css.update(FONT_WEIGHT, positions, values, new_weight)
+        self.font_weight_history.extend(values)
         return new_css
 
     def randomize_typography(self, css):
-        new_css = css.copy()
+        new_css = compile_css(css).copy()
         font_sizes = [12, 14, 16, 18, 20, 24, 28, 32, 36]
         line_heights = [1.2, 1.3, 1.4, 1.5, 1.6]
         font_weights = [300, 400, 500, 600, 700]
-        
-        for properties in new_css.values():
-            for prop in properties:
-                if 'font-size' in prop['name']:
-                    new_size = random.choice(font_sizes)
-                    prop['value'] = {f"{new_size}px"}
-                    self.font_size_history.append(str(new_size))
-                elif 'line-height' in prop['name']:
-                    new_height = random.choice(line_heights)
-                    prop['value'] = {str(new_height)}
-                    self.line_height_history.append(str(new_height))
-                elif 'font-weight' in prop['name']:
-                    new_weight = random.choice(font_weights)
-                    prop['value'] = {str(new_weight)}
-                    self.font_weight_history.append(str(new_weight))
+        choices = {FONT_SIZE: font_sizes, LINE_HEIGHT: line_heights, FONT_WEIGHT: font_weights}
+        histories = {FONT_SIZE: self.font_size_history, LINE_HEIGHT: self.line_height_history,
+                     FONT_WEIGHT: self.font_weight_history}
+
+        picks = {family: [None] * len(new_css.column(family)) for family in choices}
+        order = [(row, family, position) for family in choices
+                 for position, row in enumerate(new_css.layout.rows[family])]
+        for _, family, position in sorted(order):
+            value = random.choice(choices[family])
+            picks[family][position] = value
+            histories[family].append(str(value))
+
+        for family, values in picks.items():
+            suffix = 'px' if family == FONT_SIZE else ''
+            new_css.update(family, np.arange(len(values)), [f"{v}{suffix}" for v in values],
+                           np.array(values, dtype=np.float64))
         
         return new_css
 
@@ -195,4 +176,4 @@ class CSSModifier:
         try:
             return float(''.join(c for c in value if c.isdigit() or c == '.'))
         except:
-            return 0.0
\ No newline at end of file
+            return 0.0
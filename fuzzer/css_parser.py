@@ -0,0 +1,171 @@
+import re
+from stylesheet import CompiledStylesheet
+
+LEXER = re.compile(r'''
+    (?P<comment>/\*.*?(?:\*/|\Z))
+  | (?P<string>"(?:[^"\\]|\\.)*(?:"|\Z)|'(?:[^'\\]|\\.)*(?:'|\Z))
+  | (?P<space>\s+)
+  | (?P<open_brace>\{)
+  | (?P<close_brace>\})
+  | (?P<open>[(\[])
+  | (?P<close>[)\]])
+  | (?P<semicolon>;)
+  | (?P<other>[^\s{}()\[\];"'/]+|/)
+''', re.S | re.X)
+
+
+class StyleRule:
+    __slots__ = ('selector', 'declarations', 'start', 'end')
+
+    def __init__(self, selector, declarations, start, end):
+        self.selector = selector
+        self.declarations = declarations
+        self.start = start
+        self.end = end
+
+
+def split_declaration(pieces, declarations):
+    text = ''.join(pieces).strip()
+    name, colon, value = text.partition(':')
+    name = name.strip().lower()
+    if colon and name:
+        declarations.append((name, value.strip()))
+
+
+def parse_rules(text):
+    rules = []
+    depth = 0
+    paren = 0
+    start = None
+    prelude = []
+    pieces = []
+    declarations = []
+    nested = False
+
+    for match in LEXER.finditer(text):
+        kind = match.lastgroup
+        token = match.group()
+
+        if depth == 0:
+            if kind == 'comment' or kind == 'space':
+                if prelude and prelude[-1] != ' ':
+                    prelude.append(' ')
+                continue
+            if start is None:
+                start = match.start()
+            if kind == 'open_brace':
+                depth = 1
+                paren = 0
+                pieces = []
+                declarations = []
+                nested = text[start] == '@'
+            elif kind == 'semicolon' and text[start] == '@':
+                rules.append(text[start:match.end()])
+                start = None
+                prelude = []
+            elif kind == 'close_brace':
+                start = None
+                prelude = []
+            else:
+                prelude.append(token)
+            continue
+
+        if kind == 'open_brace':
+            depth += 1
+            nested = True
+        elif kind == 'close_brace':
+            depth -= 1
+            if depth == 0:
+                if nested:
+                    rules.append(text[start:match.end()])
+                else:
+                    split_declaration(pieces, declarations)
+                    selector = ''.join(prelude).strip()
+                    rules.append(StyleRule(selector, declarations, start, match.end()))
+                start = None
+                prelude = []
+        elif nested:
+            continue
+        elif kind == 'semicolon' and paren == 0:
+            split_declaration(pieces, declarations)
+            pieces = []
+        elif kind == 'comment':
+            if pieces and pieces[-1] != ' ':
+                pieces.append(' ')
+        elif kind == 'space':
+            if pieces and pieces[-1] != ' ':
+                pieces.append(' ')
+        else:
+            if kind == 'open':
+                paren += 1
+            elif kind == 'close':
+                paren = max(0, paren - 1)
+            pieces.append(token)
+
+    if start is not None:
+        rules.append(text[start:].rstrip())
+
+    last = {}
+    for index, rule in enumerate(rules):
+        if isinstance(rule, StyleRule):
+            previous = last.get(rule.selector)
+            if previous is not None:
+                rules[previous] = text[rules[previous].start:rules[previous].end]
+            last[rule.selector] = index
+    return rules
+
+
+def parse_css(text):
+    selectors = []
+    declarations = []
+    passthrough = []
+    for rule in parse_rules(text):
+        if isinstance(rule, str):
+            passthrough.append((len(selectors), rule))
+            continue
+        index = len(selectors)
+        selectors.append(rule.selector)
+        declarations.extend((index, name, value) for name, value in rule.declarations)
+    return CompiledStylesheet.from_declarations(selectors, declarations, passthrough)
+
+
+def parse_css_dict(text):
+    return {rule.selector: [{'name': {name}, 'value': {value}} for name, value in rule.declarations]
+            for rule in parse_rules(text) if isinstance(rule, StyleRule)}
+
+
+def format_rule(selector, declarations):
+    lines = ''.join(f"    {name}: {value};\n" for name, value in declarations)
+    return f"{selector} {{\n{lines}}}\n\n"
+
+
+def iter_css(css):
+    if not isinstance(css, CompiledStylesheet):
+        for selector, properties in css.items():
+            yield format_rule(selector, ((list(p['name'])[0], list(p['value'])[0]) for p in properties))
+        return
+
+    layout = css.layout
+    values = css.declaration_values()
+    names = layout.property_names()
+    bounds = layout.selector_bounds()
+    passthrough = iter(layout.passthrough)
+    pending = next(passthrough, None)
+    for index, selector in enumerate(layout.selectors):
+        while pending is not None and pending[0] == index:
+            yield pending[1] + "\n\n"
+            pending = next(passthrough, None)
+        rows = range(bounds[index], bounds[index + 1])
+        yield format_rule(selector, ((names[row], values[row]) for row in rows))
+    while pending is not None:
+        yield pending[1] + "\n\n"
+        pending = next(passthrough, None)
+
+
+def write_css(css, handle):
+    for chunk in iter_css(css):
+        handle.write(chunk)
+
+
+def format_css(css):
+    return ''.join(iter_css(css))
@@ -1,29 +1,62 @@
-import copy
+import hashlib
+import heapq
 import random
-from collections import defaultdict
 import os
+import pickle
+import sys
+import time
+import zlib
 from datetime import datetime
+import numpy as np
 from tqdm import tqdm
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 from resource_manager import *
 from css_evaluator import *
 from css_modifier import *
+from stylesheet import *
 from utils import *
+from css_parser import iter_css
+from html_template import HTMLTemplate
+from shared.manifest import manifest_entry
+from q_table import QTable
+from telemetry import Telemetry
+from variant_writer import VariantWriter, write_batch
 import matplotlib.pyplot as plt
 
+CHECKPOINT_VERSION = 2
+
 class CSSRLLearner:
-    def __init__(self, css, initial_html, icon_folder_path, image_folder_path, output, num, w1):
+    def __init__(self, css, initial_html, icon_folder_path, image_folder_path, output, num, w1, top_k=10,
+                 diversity_window=50, memo_size=4096, telemetry=None, manifest_path=None):
         self.output = output
+        self.manifest_path = manifest_path
         self.w1 = w1
         self.num = num
+        self.top_k = top_k
+        self.top_variants = []
+        self.variant_counter = 0
+        self.writer = None
+        self.reward_memo = LRUCache(memo_size)
+        self.saved_variants = {}
+        self.duplicate_saves = 0
+        self.telemetry = telemetry or Telemetry()
+        self.stopping = None
+        self.stop_reason = None
+        self.episodes_run = 0
+        self.best_episode = None
         
+        css = compile_css(css)
         self.current_css = css.copy()
         self.best_css = css.copy()
-        self.current_html = initial_html
-        self.best_html = copy.deepcopy(initial_html)
+        self.template = HTMLTemplate(initial_html)
+        self.current_assignment = self.template.initial_assignment()
+        self.best_assignment = self.current_assignment
         
         self.resource_manager = ResourceManager(icon_folder_path, image_folder_path)
         self.css_evaluator = CSSEvaluator()
-        self.css_modifier = CSSModifier()
+        self.css_modifier = CSSModifier(history_window=diversity_window)
         
         self.learning_rate = 0.1
         self.discount_factor = 0.9
@@ -41,61 +74,76 @@ class CSSRLLearner:
             'image': ['change_image']
         }
         
-        self.q_table = defaultdict(lambda: {action: 0.0 for action in 
-                                          sum([acts for acts in self.actions.values()], [])})
+        self.all_actions = sum([acts for acts in self.actions.values()], [])
+        self.q_table = QTable(self.all_actions)
+        self.category_action_ids = {category: np.array([self.q_table.action_ids[a] for a in acts])
+                                    for category, acts in self.actions.items()}
         
-        self.best_reward = self.calculate_total_reward(css, initial_html)
+        self.best_reward = self.calculate_total_reward(css, self.best_assignment)
 
-    def discretize_state(self, css):
-        state_features = {
-            'contrast': {'increases': 0, 'decreases': 0, 'avg_value': 0},
-            'radius': {'increases': 0, 'decreases': 0, 'avg_value': 0},
-            'typography': {'increases': 0, 'decreases': 0, 'avg_value': 0}
-        }
-        
-        for selector, properties in css.items():
-            bg_color = None
-            fg_color = None
-            for prop in properties:
-                if 'color' in prop['name']:
-                    fg_color = list(prop['value'])[0]
-                elif 'background-color' in prop['name']:
-                    bg_color = list(prop['value'])[0]
-            
-            if bg_color and fg_color:
-                contrast = self.css_evaluator.calculate_contrast_ratio(bg_color, fg_color)
-                if selector in self.css_modifier.previous_values['contrast']:
-                    prev_contrast = self.css_modifier.previous_values['contrast'][selector]
-                    change = contrast - prev_contrast
+    def state_features(self, css):
+        increases = decreases = 0
+        contrasts, pair_selectors = self.css_evaluator.pair_contrasts(css)
+        previous = self.css_modifier.previous_values['contrast']
+        if previous:
+            for contrast, selector_index in zip(contrasts.tolist(), pair_selectors):
+                selector = css.layout.selectors[selector_index]
+                if selector in previous:
+                    change = contrast - previous[selector]
                     if change > 0:
-                        state_features['contrast']['increases'] += 1
+                        increases += 1
                     elif change < 0:
-                        state_features['contrast']['decreases'] += 1
-                state_features['contrast']['avg_value'] += contrast
-        
-        state_parts = []
-        for feature, data in state_features.items():
-            inc_bin = data['increases']
-            dec_bin =  data['decreases'] 
-            avg_bin =  int(data['avg_value']) 
-            state_parts.append(f"{feature}_{inc_bin}{dec_bin}{avg_bin}")
-        
-        return "|".join(state_parts)
+                        decreases += 1
+        contrast_total = float(np.cumsum(contrasts)[-1]) if len(contrasts) else 0
+
+        return (increases, decreases, int(contrast_total), 0, 0, 0, 0, 0, 0)
+
+    def discretize_state(self, css):
+        return self.q_table.encode(self.state_features(css))
+
+    def discretize_states(self, sheets):
+        layout = sheets[0].layout
+        if self.css_modifier.previous_values['contrast'] or any(css.layout is not layout for css in sheets):
+            return np.array([self.discretize_state(css) for css in sheets])
+
+        contrast, valid = self.css_evaluator.pair_contrast_values(
+            np.stack([css.column(COLOR).data for css in sheets]),
+            np.stack([css.column(BACKGROUND_COLOR).data for css in sheets]), layout.pair_fg, layout.pair_bg)
+        totals = np.zeros(len(sheets))
+        if contrast.shape[1]:
+            totals = np.cumsum(np.where(valid, contrast, 0.0), axis=1)[:, -1]
+        return np.array([self.q_table.encode((0, 0, int(total), 0, 0, 0, 0, 0, 0)) for total in totals.tolist()])
 
     def select_action(self, state, category):
         if random.random() < self.epsilon:
             return random.choice(self.actions[category])
         
-        q_values = self.q_table[state]
         category_actions = self.actions[category]
-        return max(category_actions, key=lambda a: q_values[a])
+        return category_actions[self.q_table.greedy(state, self.category_action_ids[category])]
         
-    def apply_action(self, css, html, category, action):
+    def select_actions(self, states):
+        categories = list(self.actions)
+        picks = np.random.randint(len(categories), size=len(states))
+        explore = np.random.random(len(states)) < self.epsilon
+        choices = np.random.random(len(states))
+        actions = [None] * len(states)
+        for c, category in enumerate(categories):
+            members = np.flatnonzero(picks == c)
+            if not len(members):
+                continue
+            category_actions = self.actions[category]
+            greedy = self.q_table.greedy_batch(states[members], self.category_action_ids[category])
+            random_picks = (choices[members] * len(category_actions)).astype(int)
+            for i, g, r, e in zip(members.tolist(), greedy.tolist(), random_picks.tolist(), explore[members].tolist()):
+                actions[i] = (category, category_actions[r if e else g])
+        return actions
+
+    def apply_action(self, css, assignment, category, action):
         new_css = css.copy()
-        new_html = copy.copy(html)
+        new_assignment = assignment
         
         if category == 'icon' or category == 'image':
-            new_html, new_css = self.resource_manager.process_html(new_html, new_css)
+            new_assignment = self.resource_manager.assign_resources(self.template, assignment)
         
         elif category == 'color':
             if action == 'increase_contrast':
@@ -129,42 +177,49 @@ class CSSRLLearner:
             else:
                 new_css = self.css_modifier.randomize_typography(new_css)
                 
-        return new_css, new_html
+        return new_css, new_assignment
 
     def calculate_guideline_reward(self, css):
-        contrast_score = self.css_evaluator.evaluate_color_contrast(css)
-        radius_score = self.css_evaluator.evaluate_border_radius(css)
-        elevation_score = self.css_evaluator.evaluate_elevation(css)
-        typography_score = self.css_evaluator.evaluate_typography(css)
+        key = css.digest()
+        scores = self.reward_memo.get(key)
+        if scores is None:
+            scores = self.css_evaluator.evaluate_guidelines(css)
+            self.reward_memo.put(key, scores)
+        contrast_score, radius_score, elevation_score, typography_score = scores
         
         return (contrast_score + radius_score + elevation_score + typography_score) / 4
 
+    def calculate_guideline_rewards(self, sheets):
+        keys = [css.digest() for css in sheets]
+        scores = [self.reward_memo.get(key) for key in keys]
+        missing = [i for i, score in enumerate(scores) if score is None]
+        if missing:
+            batch = self.css_evaluator.evaluate_batch([sheets[i] for i in missing])
+            for i, row in zip(missing, batch.tolist()):
+                scores[i] = tuple(row)
+                self.reward_memo.put(keys[i], scores[i])
+        return np.array([(contrast + radius + elevation + typography) / 4
+                         for contrast, radius, elevation, typography in scores])
+
     def calculate_diversity_reward(self):
-        recent_colors = self.css_modifier.color_history[-50:] if self.css_modifier.color_history else []
-        recent_radius = self.css_modifier.radius_history[-50:] if self.css_modifier.radius_history else []
-        recent_shadows = self.css_modifier.shadow_history[-50:] if self.css_modifier.shadow_history else []
-        recent_font_sizes = self.css_modifier.font_size_history[-50:] if self.css_modifier.font_size_history else []
-        recent_line_heights = self.css_modifier.line_height_history[-50:] if self.css_modifier.line_height_history else []
-        recent_font_weights = self.css_modifier.font_weight_history[-50:] if self.css_modifier.font_weight_history else []
-        
-        color_diversity = calculate_shannon_diversity(recent_colors)
-        radius_diversity = calculate_shannon_diversity(recent_radius)
-        shadow_diversity = calculate_shannon_diversity(recent_shadows)
-        font_size_diversity = calculate_shannon_diversity(recent_font_sizes)
-        line_height_diversity = calculate_shannon_diversity(recent_line_heights)
-        font_weight_diversity = calculate_shannon_diversity(recent_font_weights)
+        color_diversity = self.css_modifier.color_history.entropy()
+        radius_diversity = self.css_modifier.radius_history.entropy()
+        shadow_diversity = self.css_modifier.shadow_history.entropy()
+        font_size_diversity = self.css_modifier.font_size_history.entropy()
+        line_height_diversity = self.css_modifier.line_height_history.entropy()
+        font_weight_diversity = self.css_modifier.font_weight_history.entropy()
 
         return (color_diversity + radius_diversity + shadow_diversity + 
                 font_size_diversity + line_height_diversity + font_weight_diversity) / 6
 
-    def calculate_resource_reward(self, html):
-        stats = self.resource_manager.get_coverage_stats()
-        return (stats['icons']['coverage'] + stats['images']['coverage']) / 2
+    def calculate_resource_reward(self, assignment):
+        icon_coverage, image_coverage = self.resource_manager.coverage()
+        return (icon_coverage + image_coverage) / 2
 
-    def calculate_total_reward(self, css, html):
+    def calculate_total_reward(self, css, assignment):
         guideline_reward = self.calculate_guideline_reward(css)
         diversity_reward = self.calculate_diversity_reward()
-        resource_reward = self.calculate_resource_reward(html)
+        resource_reward = self.calculate_resource_reward(assignment)
         
         if random.random() < self.w1:
             final_reward = diversity_reward
@@ -175,6 +230,260 @@ class CSSRLLearner:
         
         return final_reward
 
-    def save_variant(self, css, html, episode, step, reward, output_dir):
-        os.makedirs(output_dir, exist_ok=True)
-        timestamp = datetime.now
\ No newline at end of file
+    def calculate_total_rewards(self, sheets, assignments):
+        guideline_rewards = self.calculate_guideline_rewards(sheets)
+        diversity_reward = self.calculate_diversity_reward()
+        resource_reward = self.calculate_resource_reward(assignments)
+        use_diversity = np.random.random(len(sheets)) < self.w1
+        return np.where(use_diversity, diversity_reward, guideline_rewards) + resource_reward
+
+    def record_variant(self, reward, css, assignment):
+        self.variant_counter += 1
+        entry = (reward, self.variant_counter, css.copy(), assignment)
+        if len(self.top_variants) < self.top_k:
+            heapq.heappush(self.top_variants, entry)
+        elif reward > self.top_variants[0][0]:
+            heapq.heapreplace(self.top_variants, entry)
+
+    def best_variants(self):
+        return [(reward, css, assignment) for reward, _, css, assignment in sorted(self.top_variants, reverse=True)]
+
+    def render_html(self, assignment, stylesheet=None):
+        return self.template.render(self.resource_manager.slot_sources(self.template, assignment), stylesheet)
+
+    def assignment_digest(self, assignment):
+        return hashlib.blake2b(assignment.tobytes(), digest_size=16).hexdigest()
+
+    def state_digest(self, css, assignment):
+        return f"{css.digest()}:{self.assignment_digest(assignment)}"
+
+    def memo_stats(self):
+        return {'reward': self.reward_memo.stats(), 'duplicate_saves': self.duplicate_saves,
+                'saved_variants': len(self.saved_variants)}
+
+    def save_variant(self, css, assignment, episode, step, reward, output_dir):
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        base_name = f"variant_e{episode}_s{step}_r{reward:.4f}_{timestamp}"
+        css_path = os.path.join(output_dir, f"{base_name}.css")
+        html_path = os.path.join(output_dir, f"{base_name}.html")
+
+        key = (output_dir, self.state_digest(css, assignment))
+        duplicate_of = self.saved_variants.get(key)
+
+        stats = self.resource_manager.get_coverage_stats(include_distribution=False)
+        summary = (f"\nVariant {timestamp}:\n"
+                   f"Episode: {episode}, Step: {step}\n"
+                   f"Reward: {reward:.4f}\n"
+                   "Resource Usage:\n"
+                   f"- Icons Used: {stats['icons']['used']}/{stats['icons']['total']}\n"
+                   f"- Images Used: {stats['images']['used']}/{stats['images']['total']}\n")
+
+        if duplicate_of is not None:
+            self.duplicate_saves += 1
+            summary += f"Duplicate of: {duplicate_of}\n---\n"
+            self.write_files([('append', os.path.join(output_dir, 'summary.txt'), summary)])
+            return
+
+        self.saved_variants[key] = html_path
+        jobs = [
+            ('write', css_path, lambda: iter_css(css)),
+            ('write', html_path, lambda: self.render_html(assignment, css_path)),
+            ('append', os.path.join(output_dir, 'summary.txt'), summary + "---\n"),
+        ]
+        if self.manifest_path is not None:
+            group = f"variants_{self.num}"
+            entry = manifest_entry(self.manifest_path, html_path, f"{group}/index", group,
+                                   f"fuzzer/{os.path.basename(output_dir)}")
+            jobs.append(('manifest', self.manifest_path, (html_path, entry)))
+        self.write_files(jobs)
+
+    def write_files(self, jobs):
+        if self.writer is not None:
+            self.writer.submit(jobs)
+        else:
+            write_batch(jobs)
+
+    def checkpoint_path(self):
+        return os.path.join(self.output, f"variants_{self.num}", "checkpoints", "learner_state.ckpt")
+
+    def save_checkpoint(self, next_episode, path=None):
+        state = {
+            'version': CHECKPOINT_VERSION,
+            'episode': next_episode,
+            'q_table': self.q_table.get_state(),
+            'epsilon': self.epsilon,
+            'best_reward': self.best_reward,
+            'best_episode': self.best_episode,
+            'best_css': self.best_css,
+            'best_assignment': self.best_assignment,
+            'top_variants': self.top_variants,
+            'variant_counter': self.variant_counter,
+            'saved_variants': self.saved_variants,
+            'duplicate_saves': self.duplicate_saves,
+            'stopping': self.stopping.get_state() if self.stopping is not None else None,
+            'modifier': dict(vars(self.css_modifier)),
+            'resources': self.resource_manager.get_state(),
+            'random_state': random.getstate(),
+            'numpy_state': np.random.get_state(),
+        }
+        data = zlib.compress(pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL))
+        self.write_files([('atomic', path or self.checkpoint_path(), data)])
+
+    def load_checkpoint(self, path=None):
+        with open(path or self.checkpoint_path(), 'rb') as f:
+            state = pickle.loads(zlib.decompress(f.read()))
+        if state.get('version') != CHECKPOINT_VERSION:
+            raise ValueError(f"{path or self.checkpoint_path()} was written by an incompatible version, "
+                             "start the run again without resuming")
+
+        self.q_table.set_state(state['q_table'])
+        self.epsilon = state['epsilon']
+        self.best_reward = state['best_reward']
+        self.best_episode = state.get('best_episode')
+        self.best_css = state['best_css']
+        self.best_assignment = state['best_assignment']
+        self.top_variants = state['top_variants']
+        self.variant_counter = state['variant_counter']
+        self.saved_variants = state['saved_variants']
+        self.duplicate_saves = state['duplicate_saves']
+        if self.stopping is not None and state.get('stopping') is not None:
+            self.stopping.set_state(state['stopping'])
+        vars(self.css_modifier).update(state['modifier'])
+        self.resource_manager.set_state(state['resources'])
+        random.setstate(state['random_state'])
+        np.random.set_state(state['numpy_state'])
+        return state['episode']
+
+    def run_step(self, episode, step, variant_dir):
+        t0 = time.perf_counter()
+        state = self.discretize_state(self.current_css)
+        t1 = time.perf_counter()
+        category = random.choice(list(self.actions.keys()))
+        action = self.select_action(state, category)
+        t2 = time.perf_counter()
+
+        new_css, new_assignment = self.apply_action(self.current_css, self.current_assignment, category, action)
+        t3 = time.perf_counter()
+        reward = self.calculate_total_reward(new_css, new_assignment)
+        t4 = time.perf_counter()
+        next_state = self.discretize_state(new_css)
+        t5 = time.perf_counter()
+
+        self.q_table.update(state, self.q_table.action_ids[action], reward, next_state,
+                            self.learning_rate, self.discount_factor)
+
+        self.current_css = new_css
+        self.current_assignment = new_assignment
+
+        self.record_variant(reward, new_css, new_assignment)
+        t6 = time.perf_counter()
+        if reward > self.best_reward:
+            self.best_reward = reward
+            self.best_episode = episode
+            self.best_css = new_css.copy()
+            self.best_assignment = new_assignment
+            self.save_variant(new_css, new_assignment, episode, step, reward, os.path.join(variant_dir, "best"))
+        t7 = time.perf_counter()
+
+        self.telemetry.record_step(episode, step, category,
+                                   (t1 - t0 + t5 - t4, t2 - t1, t3 - t2, t4 - t3, t6 - t5, t7 - t6), t7 - t0, reward)
+        return reward
+
+    def run_vector_step(self, episode, step, variant_dir):
+        t0 = time.perf_counter()
+        states = self.discretize_states(self.env_css)
+        t1 = time.perf_counter()
+        actions = self.select_actions(states)
+        t2 = time.perf_counter()
+
+        new_sheets = []
+        new_assignments = []
+        for css, assignment, (category, action) in zip(self.env_css, self.env_assignments, actions):
+            new_css, new_assignment = self.apply_action(css, assignment, category, action)
+            new_sheets.append(new_css)
+            new_assignments.append(new_assignment)
+        t3 = time.perf_counter()
+        rewards = self.calculate_total_rewards(new_sheets, new_assignments)
+        t4 = time.perf_counter()
+        next_states = self.discretize_states(new_sheets)
+        t5 = time.perf_counter()
+
+        action_ids = np.array([self.q_table.action_ids[action] for _, action in actions])
+        self.q_table.update_batch(states, action_ids, rewards, next_states,
+                                  self.learning_rate, self.discount_factor)
+
+        self.env_css = new_sheets
+        self.env_assignments = new_assignments
+        for reward, css, assignment in zip(rewards.tolist(), new_sheets, new_assignments):
+            self.record_variant(reward, css, assignment)
+        t6 = time.perf_counter()
+
+        best = int(np.argmax(rewards))
+        if rewards[best] > self.best_reward:
+            self.best_reward = float(rewards[best])
+            self.best_episode = episode
+            self.best_css = new_sheets[best].copy()
+            self.best_assignment = new_assignments[best]
+            self.save_variant(new_sheets[best], new_assignments[best], episode, step, self.best_reward,
+                              os.path.join(variant_dir, "best"))
+        t7 = time.perf_counter()
+
+        self.telemetry.record_vector_step(episode, step, [category for category, _ in actions],
+                                          (t1 - t0 + t5 - t4, t2 - t1, t3 - t2, t4 - t3, t6 - t5, t7 - t6),
+                                          t7 - t0, float(rewards[best]))
+        return rewards
+
+    def learn(self, episodes=100, steps_per_episode=50, progress=True, resume=False, checkpoint_every=10,
+              num_envs=1, stopping=None):
+        variant_dir = os.path.join(self.output, f"variants_{self.num}")
+        self.stopping = stopping
+        self.stop_reason = None
+        self.episodes_run = 0
+        start_episode = 0
+        if resume and os.path.exists(self.checkpoint_path()):
+            start_episode = self.load_checkpoint()
+        if stopping is not None:
+            stopping.start(self)
+
+        self.writer = VariantWriter()
+        try:
+            for episode in tqdm(range(start_episode, episodes), desc=f"variants_{self.num}",
+                                initial=start_episode, total=episodes, disable=not progress):
+                self.current_css = self.best_css.copy()
+                self.current_assignment = self.best_assignment
+                self.css_evaluator.reset_cache()
+                self.telemetry.start_episode()
+            
+                if num_envs > 1:
+                    self.env_css = [self.best_css.copy() for _ in range(num_envs)]
+                    self.env_assignments = [self.best_assignment] * num_envs
+                    for step in range(steps_per_episode):
+                        self.run_vector_step(episode, step, variant_dir)
+                    self.current_css, self.current_assignment = self.env_css[0], self.env_assignments[0]
+                else:
+                    for step in range(steps_per_episode):
+                        self.run_step(episode, step, variant_dir)
+            
+                saving = time.perf_counter()
+                if episode % 10 == 0:
+                    self.save_variant(self.current_css, self.current_assignment, episode, steps_per_episode,
+                                      self.best_reward, os.path.join(variant_dir, "checkpoints"))
+            
+                self.epsilon = max(self.epsilon_min, self.epsilon * self.epsilon_decay)
+                self.episodes_run += 1
+                if stopping is not None:
+                    self.stop_reason = stopping.update(episode, self)
+
+                if self.stop_reason or (episode + 1) % checkpoint_every == 0 or episode + 1 == episodes:
+                    self.save_checkpoint(episode + 1)
+                self.telemetry.add('save', time.perf_counter() - saving)
+
+                if self.telemetry.enabled:
+                    self.write_files(self.telemetry.end_episode(episode, self))
+                if self.stop_reason:
+                    break
+        finally:
+            writer, self.writer = self.writer, None
+            writer.close()
+        
+        return self.best_css, self.render_html(self.best_assignment), self.best_reward
@@ -0,0 +1,64 @@
+from collections import deque
+
+STOP_REASONS = ('plateau', 'epsilon_floor', 'novelty')
+
+
+class EarlyStopping:
+    def __init__(self, patience=None, min_delta=0.0, epsilon_floor=False, novelty_window=None, min_novelty=0.0,
+                 min_episodes=0):
+        self.patience = patience
+        self.min_delta = min_delta
+        self.epsilon_floor = epsilon_floor
+        self.novelty_window = novelty_window
+        self.min_novelty = min_novelty
+        self.min_episodes = min_episodes
+        self.best_reward = None
+        self.best_episode = None
+        self.last_states = None
+        self.last_variants = None
+        self.novelty = deque(maxlen=novelty_window or 1)
+
+    @property
+    def enabled(self):
+        return bool(self.patience or self.epsilon_floor or self.novelty_window)
+
+    def novelty_rate(self):
+        variants = sum(count for _, count in self.novelty)
+        return sum(states for states, _ in self.novelty) / variants if variants else None
+
+    def start(self, learner):
+        if self.last_states is None:
+            self.last_states, self.last_variants = len(learner.q_table), learner.variant_counter
+
+    def update(self, episode, learner):
+        states, variants = len(learner.q_table), learner.variant_counter
+        self.novelty.append((states - self.last_states, variants - self.last_variants))
+        self.last_states, self.last_variants = states, variants
+
+        if self.best_reward is None or learner.best_reward > self.best_reward + self.min_delta:
+            self.best_reward = learner.best_reward
+            self.best_episode = episode
+
+        if episode + 1 < self.min_episodes:
+            return None
+        if self.patience and episode - self.best_episode >= self.patience:
+            return 'plateau'
+        if self.epsilon_floor and learner.epsilon <= learner.epsilon_min:
+            return 'epsilon_floor'
+        if self.novelty_window and len(self.novelty) == self.novelty_window:
+            rate = self.novelty_rate()
+            if rate is not None and rate < self.min_novelty:
+                return 'novelty'
+        return None
+
+    def get_state(self):
+        return {'best_reward': self.best_reward, 'best_episode': self.best_episode,
+                'last_states': self.last_states, 'last_variants': self.last_variants,
+                'novelty': list(self.novelty)}
+
+    def set_state(self, state):
+        self.best_reward = state['best_reward']
+        self.best_episode = state['best_episode']
+        self.last_states = state['last_states']
+        self.last_variants = state['last_variants']
+        self.novelty = deque(state['novelty'], maxlen=self.novelty_window or 1)
@@ -0,0 +1,69 @@
+import copy
+import re
+import uuid
+import numpy as np
+from bs4.dammit import EntitySubstitution
+
+ICON_SLOT = 0
+IMAGE_SLOT = 1
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+
+def slot_kind(src):
+    if src.endswith('.svg'):
+        return ICON_SLOT
+    if src.endswith(IMAGE_EXTENSIONS):
+        return IMAGE_SLOT
+    return None
+
+
+def quote_attribute(value):
+    return EntitySubstitution.quoted_attribute_value(EntitySubstitution.substitute_xml(value))
+
+
+class HTMLTemplate:
+    def __init__(self, html):
+        soup = copy.copy(html)
+        marker = f"css-fuzzer-slot-{uuid.uuid4().hex}-"
+        kinds = []
+        self.sources = []
+        self.stylesheets = []
+
+        for img in soup.find_all('img'):
+            src = img.get('src', '')
+            kind = slot_kind(src)
+            if kind is not None:
+                img['src'] = f"{marker}{len(kinds)}"
+                kinds.append(kind)
+                self.sources.append(src)
+
+        for link in soup.find_all('link'):
+            if link.get('rel', [''])[0] == 'stylesheet':
+                self.stylesheets.append(link['href'])
+                link['href'] = f"{marker}css{len(self.stylesheets) - 1}"
+
+        self.slot_kinds = np.array(kinds, dtype=np.int8)
+        parts = re.split(f'"{re.escape(marker)}(css)?(\\d+)"', soup.prettify())
+        self.segments = parts[::3]
+        self.placeholders = [(css is not None, int(index)) for css, index in zip(parts[1::3], parts[2::3])]
+
+    def __len__(self):
+        return len(self.slot_kinds)
+
+    def initial_assignment(self):
+        return np.full(len(self.slot_kinds), -1, dtype=np.int32)
+
+    def slots(self, kind):
+        return np.flatnonzero(self.slot_kinds == kind)
+
+    def render(self, sources=None, stylesheet=None):
+        sources = self.sources if sources is None else sources
+        chunks = [self.segments[0]]
+        for (is_css, index), segment in zip(self.placeholders, self.segments[1:]):
+            if is_css:
+                value = self.stylesheets[index] if stylesheet is None else stylesheet
+            else:
+                value = sources[index]
+            chunks.append(quote_attribute(value))
+            chunks.append(segment)
+        return ''.join(chunks)
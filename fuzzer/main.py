@@ -1,29 +1,262 @@
+import argparse
+import json
+import os
+import random
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
 from tqdm import tqdm
-from utils import get_css_classes, load_seed_html
+from css_parser import parse_css
+from utils import load_seed_html
 from css_rl_learner import CSSRLLearner
+from early_stopping import EarlyStopping
+from telemetry import Telemetry
+
+SEEDS_PATH = '/Users/promachowdhury/whatBreaksIt/m3-dataset/seeds'
+ICONS_PATH = '/Users/promachowdhury/whatBreaksIt/m3-dataset/material-design-icons'
+IMAGES_PATH = '/Users/promachowdhury/whatBreaksIt/downloaded_images/'
+
+def job_seed(base_seed, w, run, variants):
+    return zlib.crc32(f"{base_seed}:{w}:{run}:{variants}".encode())
+
+def job_key(job):
+    return (job['w1'], job['run'], job['variants'])
+
+def stopping_options(args):
+    options = {
+        'patience': args.patience,
+        'min_delta': args.min_delta,
+        'epsilon_floor': args.stop_at_epsilon_floor,
+        'novelty_window': args.novelty_window,
+        'min_novelty': args.min_novelty,
+        'min_episodes': args.min_episodes,
+    }
+    return options if EarlyStopping(**options).enabled else None
+
+def build_jobs(args):
+    stopping = stopping_options(args)
+    jobs = []
+    for w in args.weights:
+        for run in args.runs:
+            for variants in args.seeds:
+                jobs.append({
+                    'w1': w,
+                    'run': run,
+                    'variants': variants,
+                    'rng_seed': job_seed(args.base_seed, w, run, variants),
+                    'output': os.path.join(args.output_root, f"data_{w}_{run}"),
+                    'seeds_path': args.seeds_path,
+                    'icons_path': args.icons_path,
+                    'images_path': args.images_path,
+                    'episodes': args.episodes,
+                    'steps': args.steps,
+                    'progress': args.workers == 1,
+                    'resume': args.resume,
+                    'checkpoint_every': args.checkpoint_every,
+                    'envs': args.envs,
+                    'metrics': args.metrics,
+                    'metrics_per_step': args.metrics_per_step,
+                    'prometheus_dir': args.prometheus_dir,
+                    'manifest': args.manifest,
+                    'stopping': stopping,
+                })
+    return jobs
+
+def run_job(job):
+    random.seed(job['rng_seed'])
+    np.random.seed(job['rng_seed'])
+
+    seed_dir = os.path.join(job['seeds_path'], f"variants_{job['variants']}")
+    with open(os.path.join(seed_dir, 'index.css'), encoding='utf-8') as f:
+        css_class = parse_css(f.read())
+    html_content = load_seed_html(os.path.join(seed_dir, 'index.html'))
+
+    labels = {'w1': job['w1'], 'run': job['run'], 'variants': job['variants']}
+    metrics_path = None
+    if job['metrics'] or job['metrics_per_step']:
+        metrics_path = os.path.join(job['output'], f"variants_{job['variants']}", 'metrics.jsonl')
+    prometheus_path = None
+    if job['prometheus_dir']:
+        prometheus_path = os.path.join(job['prometheus_dir'],
+                                       f"css_fuzzer_{job['w1']}_{job['run']}_{job['variants']}.prom")
+    telemetry = Telemetry(metrics_path, prometheus_path, labels, per_step=job['metrics_per_step'])
+
+    learner = CSSRLLearner(
+        css=css_class,
+        initial_html=html_content,
+        icon_folder_path=job['icons_path'],
+        image_folder_path=job['images_path'],
+        output=job['output'],
+        num=job['variants'],
+        w1=job['w1'],
+        telemetry=telemetry,
+        manifest_path=job['manifest']
+    )
+    stopping = EarlyStopping(**job['stopping']) if job['stopping'] else None
+    learner.learn(episodes=job['episodes'], steps_per_episode=job['steps'], progress=job['progress'],
+                  resume=job['resume'], checkpoint_every=job['checkpoint_every'],
+                  num_envs=job['envs'], stopping=stopping)
+
+    stats = learner.resource_manager.get_coverage_stats(include_distribution=False)
+    return {
+        'w1': job['w1'],
+        'run': job['run'],
+        'variants': job['variants'],
+        'rng_seed': job['rng_seed'],
+        'output': os.path.join(job['output'], f"variants_{job['variants']}"),
+        'best_reward': learner.best_reward,
+        'best_episode': learner.best_episode,
+        'epsilon': learner.epsilon,
+        'episodes_run': learner.episodes_run,
+        'steps_run': learner.episodes_run * job['steps'] * job['envs'],
+        'stop_reason': learner.stop_reason,
+        'icon_coverage': stats['icons']['coverage'],
+        'image_coverage': stats['images']['coverage'],
+    }
+
+def failed_job(job, error):
+    print(f"Job w1={job['w1']} run={job['run']} variants_{job['variants']} failed: {error}")
+    return {'w1': job['w1'], 'run': job['run'], 'variants': job['variants'],
+            'rng_seed': job['rng_seed'], 'error': str(error)}
+
+def run_jobs(jobs, workers):
+    summaries = []
+    if workers == 1:
+        for job in tqdm(jobs):
+            try:
+                summaries.append(run_job(job))
+            except Exception as e:
+                summaries.append(failed_job(job, e))
+        return sorted(summaries, key=job_key)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(run_job, job): job for job in jobs}
+        for future in tqdm(as_completed(futures), total=len(futures)):
+            try:
+                summaries.append(future.result())
+            except Exception as e:
+                summaries.append(failed_job(futures[future], e))
+    return sorted(summaries, key=job_key)
+
+def rung_budgets(episodes, rungs, eta):
+    return [max(1, round(episodes / eta ** (rungs - 1 - rung))) for rung in range(rungs)]
+
+def run_halving(jobs, workers, rungs, eta):
+    # Successive halving: every job gets the first rung's episode budget. Only the 1/eta whose best reward
+    # improved most recently are resumed from their checkpoints with the next, eta times larger budget.
+    budgets = rung_budgets(jobs[0]['episodes'], rungs, eta)
+    results = {}
+    active = jobs
+    for rung, budget in enumerate(budgets):
+        for job in active:
+            job['episodes'] = budget
+            job['resume'] = job['resume'] or rung > 0
+        for summary in run_jobs(active, workers):
+            previous = results.get(job_key(summary), {})
+            results[job_key(summary)] = dict(
+                summary, rung=rung,
+                episodes_run=previous.get('episodes_run', 0) + summary.get('episodes_run', 0),
+                steps_run=previous.get('steps_run', 0) + summary.get('steps_run', 0))
+
+        if rung + 1 == len(budgets):
+            break
+        candidates = [results[job_key(job)] for job in active]
+        candidates = [s for s in candidates if 'error' not in s and not s['stop_reason']]
+        candidates.sort(key=lambda s: (-1 if s['best_episode'] is None else s['best_episode'], s['best_reward']),
+                        reverse=True)
+        keep = {job_key(s) for s in candidates[:max(1, len(candidates) // eta)]}
+        for summary in candidates:
+            if job_key(summary) not in keep:
+                summary['stop_reason'] = 'halving'
+        active = [job for job in active if job_key(job) in keep]
+        if not active:
+            break
+    return sorted(results.values(), key=job_key)
+
+def report_compute(summaries, args):
+    # Failed jobs are left out of the budget, so their unspent episodes do not count as saved compute.
+    failed = [summary for summary in summaries if 'error' in summary]
+    finished = [summary for summary in summaries if 'error' not in summary]
+    budget = len(finished) * args.episodes * args.steps * args.envs
+    steps_run = sum(summary['steps_run'] for summary in finished)
+    saved = budget - steps_run
+    if budget:
+        print(f"Ran {steps_run:,} of {budget:,} budgeted learner steps, saved {saved:,} ({saved / budget:.1%})")
+    if failed:
+        print(f"  failed: {len(failed)} job(s), not counted in the budget "
+              f"({sum(summary.get('steps_run', 0) for summary in failed):,} steps run before failing)")
+    reasons = {}
+    for summary in finished:
+        if summary['stop_reason']:
+            reasons[summary['stop_reason']] = reasons.get(summary['stop_reason'], 0) + 1
+    for reason, count in sorted(reasons.items()):
+        print(f"  stopped early ({reason}): {count} job(s)")
+    return {'budget_steps': budget, 'steps_run': steps_run, 'steps_saved': saved, 'failed_jobs': len(failed)}
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Train CSS RL learners over a sweep of seeds and weights")
+    parser.add_argument('--weights', type=float, nargs='+', default=[0.8])
+    parser.add_argument('--runs', type=int, nargs='+', default=[5])
+    parser.add_argument('--seeds', type=int, nargs='+', default=list(range(1, 8)))
+    parser.add_argument('--episodes', type=int, default=500)
+    parser.add_argument('--steps', type=int, default=50)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--base-seed', type=int, default=0)
+    parser.add_argument('--seeds-path', default=SEEDS_PATH)
+    parser.add_argument('--icons-path', default=ICONS_PATH)
+    parser.add_argument('--images-path', default=IMAGES_PATH)
+    parser.add_argument('--output-root', default='.')
+    parser.add_argument('--checkpoint-every', type=int, default=10)
+    parser.add_argument('--resume', action='store_true')
+    parser.add_argument('--envs', type=int, default=1,
+                        help="number of environments stepped together against a shared Q-table")
+    parser.add_argument('--metrics', action='store_true',
+                        help="append per-episode timing metrics to variants_N/metrics.jsonl")
+    parser.add_argument('--metrics-per-step', action='store_true',
+                        help="also write one metrics record per learner step")
+    parser.add_argument('--prometheus-dir',
+                        help="directory for Prometheus textfile collector metrics, one file per job")
+    parser.add_argument('--patience', type=int,
+                        help="stop a job once its best reward has not improved for this many episodes")
+    parser.add_argument('--min-delta', type=float, default=0.0,
+                        help="smallest best-reward gain that counts as an improvement for --patience")
+    parser.add_argument('--stop-at-epsilon-floor', action='store_true',
+                        help="stop a job once epsilon has decayed to its minimum")
+    parser.add_argument('--novelty-window', type=int,
+                        help="episodes over which the rate of newly visited states is measured")
+    parser.add_argument('--min-novelty', type=float, default=0.01,
+                        help="stop a job when new states per evaluated variant fall below this over the window")
+    parser.add_argument('--min-episodes', type=int, default=0,
+                        help="never stop a job early before this many episodes")
+    parser.add_argument('--schedule', choices=['fixed', 'halving'], default='fixed',
+                        help="'halving' runs successive halving over the (w1, run, seed) jobs")
+    parser.add_argument('--rungs', type=int, default=3, help="number of successive halving rungs")
+    parser.add_argument('--eta', type=int, default=2,
+                        help="keep 1/eta of the jobs after each rung and multiply their budget by eta")
+    parser.add_argument('--manifest',
+                        help="append every saved variant to this JSONL manifest so a renderer can tail it")
+    return parser.parse_args()
 
 def main():
-    weights = [0.8]
-    for w in weights:
-        for i in range(5, 6):
-            for variants in tqdm(range(1, 8)):
-                with open(f'/Users/promachowdhury/whatBreaksIt/m3-dataset/seeds/variants_{variants}/index.css', encoding='utf-8') as f:
-                    contents = f.read()
-                    css_class = get_css_classes(contents)
-
-                html_content = load_seed_html(f'/Users/promachowdhury/whatBreaksIt/m3-dataset/seeds/variants_{variants}/index.html')
-                
-                learner = CSSRLLearner(
-                    css=css_class,
-                    initial_html=html_content,
-                    icon_folder_path="/Users/promachowdhury/whatBreaksIt/m3-dataset/material-design-icons",
-                    image_folder_path="/Users/promachowdhury/whatBreaksIt/downloaded_images/",
-                    output=f"data_{w}_{i}",
-                    num=variants,
-                    w1=w
-                )
-
-                learner.learn(episodes=500, steps_per_episode=50)
+    args = parse_args()
+    jobs = build_jobs(args)
+    if args.schedule == 'halving':
+        summaries = run_halving(jobs, args.workers, args.rungs, args.eta)
+    else:
+        summaries = run_jobs(jobs, args.workers)
+
+    os.makedirs(args.output_root, exist_ok=True)
+    with open(os.path.join(args.output_root, 'sweep_summary.json'), 'w', encoding='utf-8') as f:
+        json.dump(summaries, f, indent=2)
+
+    for summary in summaries:
+        if 'error' in summary:
+            print(f"w1={summary['w1']} run={summary['run']} variants_{summary['variants']}: failed")
+        else:
+            stopped = f" (stopped: {summary['stop_reason']})" if summary.get('stop_reason') else ""
+            print(f"w1={summary['w1']} run={summary['run']} variants_{summary['variants']}: "
+                  f"best reward {summary['best_reward']:.4f} after {summary['episodes_run']} episodes{stopped}")
+    report_compute(summaries, args)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
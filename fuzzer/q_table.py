@@ -0,0 +1,85 @@
+import numpy as np
+
+STATE_FEATURES = ('contrast', 'radius', 'typography')
+FEATURE_BOUNDS = (1023, 1023, 65535)
+
+
+class StateEncoder:
+    def __init__(self, features=STATE_FEATURES, bounds=FEATURE_BOUNDS):
+        self.features = features
+        self.bounds = bounds * len(features)
+
+    def pack(self, values):
+        key = 0
+        for value, bound in zip(values, self.bounds):
+            key = key * (bound + 1) + min(max(int(value), 0), bound)
+        return key
+
+    def unpack(self, key):
+        values = []
+        for bound in reversed(self.bounds):
+            key, value = divmod(key, bound + 1)
+            values.append(value)
+        return tuple(reversed(values))
+
+    def describe(self, key):
+        values = self.unpack(key)
+        return "|".join(f"{feature}_{values[3 * i]}{values[3 * i + 1]}{values[3 * i + 2]}"
+                        for i, feature in enumerate(self.features))
+
+
+class QTable:
+    def __init__(self, actions, encoder=None, capacity=256):
+        self.actions = list(dict.fromkeys(actions))
+        self.action_ids = {action: i for i, action in enumerate(self.actions)}
+        self.encoder = encoder or StateEncoder()
+        self.values = np.zeros((capacity, len(self.actions)), dtype=np.float32)
+        self.rows = {}
+
+    def __len__(self):
+        return len(self.rows)
+
+    def index(self, key):
+        row = self.rows.get(key)
+        if row is None:
+            row = len(self.rows)
+            if row == len(self.values):
+                grown = np.zeros((2 * len(self.values), len(self.actions)), dtype=np.float32)
+                grown[:row] = self.values
+                self.values = grown
+            self.rows[key] = row
+        return row
+
+    def encode(self, values):
+        return self.index(self.encoder.pack(values))
+
+    def greedy(self, state, action_ids):
+        return int(np.argmax(self.values[state, action_ids]))
+
+    def greedy_batch(self, states, action_ids):
+        return np.argmax(self.values[np.ix_(states, action_ids)], axis=1)
+
+    def update_batch(self, states, actions, rewards, next_states, learning_rate, discount_factor):
+        best_next_q = self.values[next_states].max(axis=1).astype(np.float64)
+        current = self.values[states, actions].astype(np.float64)
+        delta = learning_rate * (rewards + discount_factor * best_next_q - current)
+        np.add.at(self.values, (states, actions), delta.astype(np.float32))
+
+    def update(self, state, action, reward, next_state, learning_rate, discount_factor):
+        best_next_q = float(self.values[next_state].max())
+        current = float(self.values[state, action])
+        self.values[state, action] = current + learning_rate * (reward + discount_factor * best_next_q - current)
+
+    def to_dict(self):
+        return {self.encoder.describe(key): dict(zip(self.actions, self.values[row].tolist()))
+                for key, row in self.rows.items()}
+
+    def get_state(self):
+        return {'actions': self.actions, 'keys': list(self.rows), 'values': self.values[:len(self.rows)].copy()}
+
+    def set_state(self, state):
+        if state['actions'] != self.actions:
+            raise ValueError("Q-table checkpoint was written for a different action set")
+        self.rows = {key: row for row, key in enumerate(state['keys'])}
+        self.values = np.zeros((max(len(self.rows) * 2, 256), len(self.actions)), dtype=np.float32)
+        self.values[:len(self.rows)] = state['values']
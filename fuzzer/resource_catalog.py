@@ -0,0 +1,74 @@
+import os
+import glob
+import hashlib
+import sys
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shared.file_index import load_index
+
+CACHE_DIR = os.environ.get('CSS_FUZZER_CACHE_DIR',
+                           os.path.join(os.path.expanduser('~'), '.cache', 'css_fuzzer'))
+IMAGE_PATTERNS = ['*.png', '*.jpg', '*.jpeg']
+
+_catalogs = {}
+
+
+def icon_directories(root):
+    directories = []
+    for dirpath, dirnames, _ in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith('.'))
+        directories.append(dirpath)
+    return directories
+
+
+def scan_icons(root):
+    icons = {}
+    for file in sorted(glob.glob(os.path.join(root, '**/*.svg'), recursive=True)):
+        icons[Path(file).stem] = file
+    return icons, icon_directories(root)
+
+
+def scan_images(root):
+    images = set()
+    for ext in IMAGE_PATTERNS:
+        images.update(Path(f).name for f in glob.glob(os.path.join(root, ext)))
+    return sorted(images), [root]
+
+
+def index_path(kind, root):
+    digest = hashlib.sha1(f"{kind}:{os.path.abspath(root)}".encode()).hexdigest()[:16]
+    return os.path.join(CACHE_DIR, f"{kind}_{digest}.json")
+
+
+def load_catalog(kind, root, scan):
+    # The root is always signed, so a folder that is missing now invalidates the index once it appears.
+    def scan_root():
+        entries, directories = scan(root)
+        return entries, [root, *directories]
+    return load_index(index_path(kind, root), os.path.abspath(root), scan_root)
+
+
+def get_catalog(kind, root):
+    key = (kind, os.path.abspath(root))
+    if key not in _catalogs:
+        scan = scan_icons if kind == 'icons' else scan_images
+        _catalogs[key] = load_catalog(kind, root, scan)
+    return _catalogs[key]
+
+
+def get_icon_catalog(root):
+    return get_catalog('icons', root)
+
+
+def get_image_catalog(root):
+    return get_catalog('images', root)
+
+
+def register_catalog(kind, root, entries):
+    _catalogs[(kind, os.path.abspath(root))] = entries
+
+
+def clear_catalogs():
+    _catalogs.clear()
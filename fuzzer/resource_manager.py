@@ -1,9 +1,65 @@
-import os
-import glob
-from pathlib import Path
 from collections import defaultdict
 import random
-import copy
+from html_template import ICON_SLOT
+from resource_catalog import get_icon_catalog, get_image_catalog
+
+class IndexedPool:
+    def __init__(self, items=()):
+        self.items = list(items)
+        self.positions = {item: i for i, item in enumerate(self.items)}
+
+    def add(self, item):
+        if item not in self.positions:
+            self.positions[item] = len(self.items)
+            self.items.append(item)
+
+    def remove(self, item):
+        index = self.positions.pop(item)
+        last = self.items.pop()
+        if index < len(self.items):
+            self.items[index] = last
+            self.positions[last] = index
+
+    def choice(self):
+        return random.choice(self.items)
+
+    def __contains__(self, item):
+        return item in self.positions
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+
+class UsageBuckets:
+    def __init__(self, items):
+        self.counts = dict.fromkeys(items, 0)
+        self.buckets = {0: IndexedPool(self.counts)} if self.counts else {}
+        self.min_count = 0
+
+    def increment(self, item):
+        count = self.counts[item]
+        bucket = self.buckets[count]
+        bucket.remove(item)
+        if not bucket:
+            del self.buckets[count]
+            if count == self.min_count:
+                self.min_count = count + 1
+        self.counts[item] = count + 1
+        self.buckets.setdefault(count + 1, IndexedPool()).add(item)
+
+    def least_used(self):
+        return self.buckets.get(self.min_count, IndexedPool())
+
+    def least_used_excluding(self, excluded):
+        for count in sorted(self.buckets):
+            for item in self.buckets[count]:
+                if item not in excluded:
+                    return item
+        return None
+
 
 class ResourceManager:
     def __init__(self, icon_folder_path: str, image_folder_path: str):
@@ -11,96 +67,133 @@ class ResourceManager:
         self.image_folder = image_folder_path
         self.available_icons = self.load_icons()
         self.available_images = self.load_images()
+        self.icon_names = list(self.available_icons)
+        self.icon_ids = {name: i for i, name in enumerate(self.icon_names)}
+        self.image_ids = {name: i for i, name in enumerate(self.available_images)}
         self.icon_usage = defaultdict(int)
-        self.unused_icons = set(self.available_icons.keys())
+        self.unused_icons = IndexedPool(self.available_icons)
+        self.icon_buckets = UsageBuckets(self.available_icons)
         self.image_usage = defaultdict(int)
-        self.unused_images = set(self.available_images)
+        self.unused_images = IndexedPool(self.available_images)
+        self.image_buckets = UsageBuckets(self.available_images)
         self.current_page_icons = set()
         self.current_page_images = set()
 
     def load_icons(self):
-        icons = {}
-        for file in glob.glob(os.path.join(self.icon_folder, '**/*.svg'), recursive=True):
-            name = Path(file).stem
-            icons[name] = file
-        return icons
+        return get_icon_catalog(self.icon_folder)
 
     def select_icon(self):
         if self.unused_icons:
-            selected_name = random.choice(list(self.unused_icons))
+            selected_name = self.unused_icons.choice()
             self.unused_icons.remove(selected_name)
         else:
-            usage_counts = [(name, count) for name, count in self.icon_usage.items()]
-            min_usage = min(usage_counts, key=lambda x: x[1])[1]
-            least_used = [name for name, count in usage_counts if count == min_usage]
-            selected_name = random.choice(least_used)
-        
+            selected_name = self.icon_buckets.least_used().choice()
+
         icon_path = self.available_icons[selected_name]
         return selected_name, icon_path
 
     def load_images(self):
-        images = set()
-        for ext in ['*.png', '*.jpg', '*.jpeg']:
-            images.update(Path(f).name for f in glob.glob(os.path.join(self.image_folder, ext)))
-        return images
+        return get_image_catalog(self.image_folder)
 
     def select_image(self):
         if self.unused_images:
-            selected = random.choice(list(self.unused_images))
+            selected = self.unused_images.choice()
             self.unused_images.remove(selected)
             return selected
-        
-        available = self.available_images - self.current_page_images
-        if available:
-            return min(available, key=lambda x: self.image_usage[x])
-            
-        return min(self.available_images, key=lambda x: self.image_usage[x])
-
-    def get_coverage_stats(self):
+
+        available = self.image_buckets.least_used_excluding(self.current_page_images)
+        if available is not None:
+            return available
+
+        return self.image_buckets.least_used().items[0]
+
+    def record_icon_use(self, name):
+        self.icon_usage[name] += 1
+        self.icon_buckets.increment(name)
+        self.current_page_icons.add(name)
+
+    def record_image_use(self, name):
+        self.image_usage[name] += 1
+        self.image_buckets.increment(name)
+
+    def get_state(self):
+        return {
+            'icon_usage': dict(self.icon_usage),
+            'unused_icons': self.unused_icons,
+            'icon_buckets': self.icon_buckets,
+            'image_usage': dict(self.image_usage),
+            'unused_images': self.unused_images,
+            'image_buckets': self.image_buckets,
+            'current_page_icons': sorted(self.current_page_icons),
+            'current_page_images': sorted(self.current_page_images)
+        }
+
+    def set_state(self, state):
+        self.icon_usage = defaultdict(int, state['icon_usage'])
+        self.unused_icons = state['unused_icons']
+        self.icon_buckets = state['icon_buckets']
+        self.image_usage = defaultdict(int, state['image_usage'])
+        self.unused_images = state['unused_images']
+        self.image_buckets = state['image_buckets']
+        self.current_page_icons = set(state['current_page_icons'])
+        self.current_page_images = set(state['current_page_images'])
+
+    def coverage(self):
+        icon_coverage = len(self.icon_usage) / len(self.available_icons) if self.available_icons else 0
+        image_coverage = len(self.image_usage) / len(self.available_images) if self.available_images else 0
+        return icon_coverage, image_coverage
+
+    def get_coverage_stats(self, include_distribution=True):
         total_icons = len(self.available_icons)
         used_icons = len(self.icon_usage)
-        icon_coverage = used_icons / total_icons if total_icons > 0 else 0
-        
-        return {
+        icon_coverage, image_coverage = self.coverage()
+
+        stats = {
             'icons': {
                 'total': total_icons,
                 'used': used_icons,
                 'unused': total_icons - used_icons,
-                'coverage': icon_coverage,
-                'usage_distribution': dict(self.icon_usage)
+                'coverage': icon_coverage
             },
             'images': {
                 'total': len(self.available_images),
                 'used': len(self.image_usage),
                 'unused': len(self.unused_images),
-                'coverage': len(self.image_usage) / len(self.available_images) if self.available_images else 0,
-                'usage_distribution': dict(self.image_usage)
+                'coverage': image_coverage
             }
         }
+        if include_distribution:
+            stats['icons']['usage_distribution'] = dict(self.icon_usage)
+            stats['images']['usage_distribution'] = dict(self.image_usage)
+        return stats
+
+    def resource_path(self, kind, index):
+        if kind == ICON_SLOT:
+            return f"{self.icon_folder}/{self.icon_names[index]}.svg"
+        return f"{self.image_folder}{self.available_images[index]}"
+
+    def slot_sources(self, template, assignment):
+        return [template.sources[slot] if index < 0 else self.resource_path(kind, index)
+                for slot, (kind, index) in enumerate(zip(template.slot_kinds.tolist(), assignment.tolist()))]
 
-    def process_html(self, html, css):
-        new_html = copy.copy(html)
-        new_css = css.copy()
+    def assign_resources(self, template, assignment):
+        new_assignment = assignment.copy()
         self.current_page_icons.clear()
-        
-        for img in new_html.find_all('img'):
-            src = img.get('src', '')
-            
-            if src.endswith('.svg'):
+
+        for slot, kind in enumerate(template.slot_kinds.tolist()):
+            if kind == ICON_SLOT:
                 icon_name, icon_content = self.select_icon()
-                new_src = f"{self.icon_folder}/{icon_name}.svg"
-                img['src'] = new_src
-                self.icon_usage[icon_name] += 1
-                self.current_page_icons.add(icon_name)
-            
-            elif any(src.endswith(ext) for ext in ['.png', '.jpg', '.jpeg']):
+                new_assignment[slot] = self.icon_ids[icon_name]
+                self.record_icon_use(icon_name)
+
+            else:
                 if self.unused_images:
-                    new_image = random.choice(list(self.unused_images))
+                    new_image = self.unused_images.choice()
                     self.unused_images.remove(new_image)
                 else:
-                    new_image = random.choice(list(self.available_images))
-                
-                img['src'] = f"{self.image_folder}{new_image}"
-                self.image_usage[new_image] += 1
+                    new_image = random.choice(self.available_images)
+
+                new_assignment[slot] = self.image_ids[new_image]
+                self.record_image_use(new_image)
 
-        return new_html, new_css
\ No newline at end of file
+        return new_assignment
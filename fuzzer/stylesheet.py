@@ -0,0 +1,247 @@
+import re
+import hashlib
+import itertools
+import numpy as np
+from colors import parse_colors
+
+COLOR = 'color'
+BACKGROUND_COLOR = 'background-color'
+BORDER_RADIUS = 'border-radius'
+BOX_SHADOW = 'box-shadow'
+FONT_SIZE = 'font-size'
+LINE_HEIGHT = 'line-height'
+FONT_WEIGHT = 'font-weight'
+
+COLOR_FAMILIES = (COLOR, BACKGROUND_COLOR)
+NUMERIC_FAMILIES = (BORDER_RADIUS, FONT_SIZE, LINE_HEIGHT, FONT_WEIGHT)
+FAMILIES = COLOR_FAMILIES + NUMERIC_FAMILIES + (BOX_SHADOW,)
+
+SHADOW_X, SHADOW_Y, SHADOW_BLUR, SHADOW_ELEVATION = range(4)
+
+_origins = itertools.count()
+_property_ids = {}
+_property_names = []
+
+
+def property_id(name):
+    pid = _property_ids.get(name)
+    if pid is None:
+        pid = len(_property_names)
+        _property_ids[name] = pid
+        _property_names.append(name)
+    return pid
+
+
+def property_name(pid):
+    return _property_names[pid]
+
+
+def extract_number(value):
+    try:
+        return float(''.join(c for c in value if c.isdigit() or c == '.'))
+    except:
+        return 0.0
+
+
+def parse_shadow(value):
+    offsets = [float(n) for n in re.findall(r'-?\d+\.?\d*', value)]
+    elevation = [float(n) for n in re.findall(r'-?\d*\.?\d+', value)]
+    row = [np.nan, np.nan, np.nan, max(elevation) if elevation else 0]
+    if len(offsets) >= 3:
+        row[:3] = offsets[:3]
+    return row
+
+
+def parse_values(family, values):
+    if family in COLOR_FAMILIES:
+        return parse_colors(values)
+    if family == BOX_SHADOW:
+        return np.array([parse_shadow(v) for v in values], dtype=np.float64).reshape(-1, 4)
+    return np.array([extract_number(v) for v in values], dtype=np.float64)
+
+
+class StylesheetLayout:
+    def __init__(self, selectors, declarations, passthrough=()):
+        self.selectors = tuple(selectors)
+        self.passthrough = tuple(passthrough)
+        self.prop_ids = np.array([property_id(name) for _, name, _ in declarations], dtype=np.int32)
+        self.decl_selectors = np.array([sel for sel, _, _ in declarations], dtype=np.int32)
+        self.static_values = {}
+        self.cache = {}
+        self.rows = {}
+        self.entry_selectors = {}
+        self.last_entry = {}
+
+        for family in FAMILIES:
+            rows = np.flatnonzero(self.prop_ids == property_id(family)).astype(np.int32)
+            self.rows[family] = rows
+            self.entry_selectors[family] = self.decl_selectors[rows]
+            last = np.full(len(self.selectors), -1, dtype=np.int32)
+            np.maximum.at(last, self.entry_selectors[family], np.arange(len(rows), dtype=np.int32))
+            self.last_entry[family] = last
+
+        family_ids = {property_id(f) for f in FAMILIES}
+        for row, (_, name, value) in enumerate(declarations):
+            if _property_ids[name] not in family_ids:
+                self.static_values[row] = value
+
+        has_pair = (self.last_entry[COLOR] >= 0) & (self.last_entry[BACKGROUND_COLOR] >= 0)
+        self.pair_selectors = np.flatnonzero(has_pair).astype(np.int32)
+        self.pair_fg = self.last_entry[COLOR][self.pair_selectors]
+        self.pair_bg = self.last_entry[BACKGROUND_COLOR][self.pair_selectors]
+        pair_of_selector = np.full(len(self.selectors), -1, dtype=np.int32)
+        pair_of_selector[self.pair_selectors] = np.arange(len(self.pair_selectors), dtype=np.int32)
+        self.entry_pairs = {f: pair_of_selector[self.entry_selectors[f]] for f in COLOR_FAMILIES}
+
+    def __len__(self):
+        return len(self.prop_ids)
+
+    def property_names(self):
+        if 'property_names' not in self.cache:
+            self.cache['property_names'] = [property_name(pid) for pid in self.prop_ids.tolist()]
+        return self.cache['property_names']
+
+    def selector_bounds(self):
+        if 'selector_bounds' not in self.cache:
+            self.cache['selector_bounds'] = np.searchsorted(
+                self.decl_selectors, np.arange(len(self.selectors) + 1)).tolist()
+        return self.cache['selector_bounds']
+
+    def digest(self):
+        if 'digest' not in self.cache:
+            h = hashlib.blake2b(digest_size=16)
+            h.update('\0'.join(self.selectors).encode('utf-8'))
+            for index, text in self.passthrough:
+                h.update(f"{index}\0{text}\0".encode('utf-8'))
+            h.update(self.prop_ids.tobytes())
+            h.update(self.decl_selectors.tobytes())
+            for row in sorted(self.static_values):
+                h.update(f"{row}\0{self.static_values[row]}\0".encode('utf-8'))
+            self.cache['digest'] = h.digest()
+        return self.cache['digest']
+
+
+class Column:
+    __slots__ = ('values', 'data', 'hash')
+
+    def __init__(self, values, data):
+        self.values = values
+        self.data = data
+        self.hash = None
+
+    def __len__(self):
+        return len(self.values)
+
+    def digest(self):
+        if self.hash is None:
+            self.hash = hashlib.blake2b('\0'.join(self.values).encode('utf-8'), digest_size=16).digest()
+        return self.hash
+
+    def copy(self):
+        return Column(list(self.values), self.data.copy())
+
+
+class CompiledStylesheet:
+    def __init__(self, layout, columns, owned=None, origin=None, dirty=None):
+        self.layout = layout
+        self.columns = columns
+        self.owned = set() if owned is None else owned
+        self.origin = next(_origins) if origin is None else origin
+        self.dirty = {} if dirty is None else dirty
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.owned = set()
+        self.origin = next(_origins)
+        self.dirty = {}
+
+    @classmethod
+    def from_dict(cls, css):
+        selectors = list(css.keys())
+        declarations = []
+        for index, properties in enumerate(css.values()):
+            for prop in properties:
+                declarations.append((index, list(prop['name'])[0], list(prop['value'])[0]))
+        return cls.from_declarations(selectors, declarations)
+
+    @classmethod
+    def from_declarations(cls, selectors, declarations, passthrough=()):
+        layout = StylesheetLayout(selectors, declarations, passthrough)
+        columns = {}
+        for family in FAMILIES:
+            values = [declarations[row][2] for row in layout.rows[family]]
+            columns[family] = Column(values, parse_values(family, values))
+        return cls(layout, columns, set(columns))
+
+    def copy(self):
+        self.owned.clear()
+        dirty = {family: list(positions) for family, positions in self.dirty.items()}
+        return CompiledStylesheet(self.layout, dict(self.columns), origin=self.origin, dirty=dirty)
+
+    def column(self, family):
+        return self.columns[family]
+
+    def writable_column(self, family):
+        if family not in self.owned:
+            self.columns[family] = self.columns[family].copy()
+            self.owned.add(family)
+        return self.columns[family]
+
+    def update(self, family, positions, values, data=None):
+        column = self.writable_column(family)
+        column.hash = None
+        for position, value in zip(positions, values):
+            column.values[position] = value
+        if data is None:
+            data = parse_values(family, values)
+        data = np.asarray(data, dtype=column.data.dtype).reshape((len(positions),) + column.data.shape[1:])
+        column.data[positions] = data
+        self.dirty.setdefault(family, []).append(np.asarray(positions, dtype=np.int64))
+
+    def changed_positions(self, family):
+        if family not in self.dirty:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(self.dirty[family]))
+
+    def digest(self):
+        h = hashlib.blake2b(self.layout.digest(), digest_size=16)
+        for family in FAMILIES:
+            h.update(self.columns[family].digest())
+        return h.hexdigest()
+
+    def mark_clean(self):
+        self.origin = next(_origins)
+        self.dirty = {}
+        return self.origin
+
+    def declaration_values(self):
+        values = [None] * len(self.layout)
+        for row, value in self.layout.static_values.items():
+            values[row] = value
+        for family, column in self.columns.items():
+            for row, value in zip(self.layout.rows[family], column.values):
+                values[row] = value
+        return values
+
+    def keys(self):
+        return self.layout.selectors
+
+    def items(self):
+        values = self.declaration_values()
+        properties = [[] for _ in self.layout.selectors]
+        for row, value in enumerate(values):
+            name = property_name(self.layout.prop_ids[row])
+            properties[self.layout.decl_selectors[row]].append({'name': {name}, 'value': {value}})
+        return zip(self.layout.selectors, properties)
+
+    def to_dict(self):
+        return dict(self.items())
+
+    def __len__(self):
+        return len(self.layout.selectors)
+
+
+def compile_css(css):
+    if isinstance(css, CompiledStylesheet):
+        return css
+    return CompiledStylesheet.from_dict(css)
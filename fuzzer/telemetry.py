@@ -0,0 +1,192 @@
+import bisect
+import json
+import sys
+import time
+from collections import defaultdict
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+PHASES = ('discretize', 'select', 'apply', 'reward', 'update', 'save')
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+                   2.5, 5.0)
+
+
+def max_rss_bytes():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+class LatencyHistogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def quantile(self, q):
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return self.buckets[i] if i < len(self.buckets) else None
+        return None
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'mean': self.sum / self.count if self.count else None,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+        }
+
+
+class Telemetry:
+    def __init__(self, metrics_path=None, prometheus_path=None, labels=None, per_step=False):
+        self.metrics_path = metrics_path
+        self.prometheus_path = prometheus_path
+        self.labels = labels or {}
+        self.per_step = per_step
+        self.latency = defaultdict(LatencyHistogram)
+        self.vector_latency = defaultdict(LatencyHistogram)
+        self.phase_totals = dict.fromkeys(PHASES, 0.0)
+        self.episode_phases = dict.fromkeys(PHASES, 0.0)
+        self.steps = 0
+        self.episode_steps = 0
+        self.started = time.perf_counter()
+        self.episode_started = self.started
+        self.pending = []
+
+    @property
+    def enabled(self):
+        return self.metrics_path is not None or self.prometheus_path is not None
+
+    def add(self, phase, seconds):
+        self.phase_totals[phase] += seconds
+        self.episode_phases[phase] += seconds
+
+    def add_phases(self, phases):
+        for phase, seconds in zip(PHASES, phases):
+            self.phase_totals[phase] += seconds
+            self.episode_phases[phase] += seconds
+
+    def record_step(self, episode, step, category, phases, total, reward):
+        self.add_phases(phases)
+        self.latency[category].observe(total)
+        self.steps += 1
+        self.episode_steps += 1
+        if self.per_step and self.metrics_path is not None:
+            self.pending.append(json.dumps({
+                'type': 'step', 'episode': episode, 'step': step, 'category': category,
+                'seconds': total, 'reward': reward, 'phases': dict(zip(PHASES, phases)),
+            }) + "\n")
+
+    def record_vector_step(self, episode, step, categories, phases, total, reward):
+        # Each env's action category gets its share of the batch; the whole batch goes to its own histogram.
+        self.add_phases(phases)
+        share = total / len(categories)
+        for category in categories:
+            self.latency[category].observe(share)
+        self.vector_latency[len(categories)].observe(total)
+        self.steps += 1
+        self.episode_steps += 1
+        if self.per_step and self.metrics_path is not None:
+            self.pending.append(json.dumps({
+                'type': 'step', 'episode': episode, 'step': step, 'categories': list(categories),
+                'seconds': total, 'reward': reward, 'phases': dict(zip(PHASES, phases)),
+            }) + "\n")
+
+    def start_episode(self):
+        self.episode_started = time.perf_counter()
+        self.episode_steps = 0
+        self.episode_phases = dict.fromkeys(PHASES, 0.0)
+
+    def end_episode(self, episode, learner):
+        now = time.perf_counter()
+        episode_seconds = now - self.episode_started
+        record = {
+            'type': 'episode',
+            'episode': episode,
+            'time': time.time(),
+            **self.labels,
+            'steps': self.episode_steps,
+            'steps_total': self.steps,
+            'episode_seconds': episode_seconds,
+            'steps_per_sec': self.episode_steps / episode_seconds if episode_seconds > 0 else None,
+            'steps_per_sec_total': self.steps / (now - self.started) if now > self.started else None,
+            'epsilon': learner.epsilon,
+            'best_reward': learner.best_reward,
+            'q_table_states': len(learner.q_table),
+            'max_rss_bytes': max_rss_bytes(),
+            'phases': dict(self.episode_phases),
+            'latency': {category: h.summary() for category, h in sorted(self.latency.items())},
+        }
+        if self.vector_latency:
+            record['vector_latency'] = {envs: h.summary() for envs, h in sorted(self.vector_latency.items())}
+
+        jobs = []
+        if self.metrics_path is not None:
+            self.pending.append(json.dumps(record) + "\n")
+            jobs.append(('append', self.metrics_path, ''.join(self.pending)))
+            self.pending = []
+        if self.prometheus_path is not None:
+            jobs.append(('atomic', self.prometheus_path, self.prometheus_text(record)))
+        return jobs
+
+    def prometheus_text(self, record):
+        labels = ','.join(f'{k}="{v}"' for k, v in sorted(self.labels.items()))
+
+        def sample(name, value, extra=''):
+            label_text = ','.join(part for part in (labels, extra) if part)
+            return f"{name}{{{label_text}}} {value}\n" if label_text else f"{name} {value}\n"
+
+        lines = []
+        gauges = [
+            ('css_fuzzer_episode', 'Last completed episode', record['episode']),
+            ('css_fuzzer_steps_per_second', 'Steps per second over the last episode', record['steps_per_sec']),
+            ('css_fuzzer_epsilon', 'Exploration rate', record['epsilon']),
+            ('css_fuzzer_best_reward', 'Best reward so far', record['best_reward']),
+            ('css_fuzzer_q_table_states', 'Number of states in the Q-table', record['q_table_states']),
+            ('css_fuzzer_max_rss_bytes', 'Peak resident set size', record['max_rss_bytes']),
+        ]
+        for name, help_text, value in gauges:
+            if value is not None:
+                lines.append(f"# HELP {name} {help_text}\n# TYPE {name} gauge\n")
+                lines.append(sample(name, value))
+
+        lines.append("# HELP css_fuzzer_steps_total Learner steps taken\n# TYPE css_fuzzer_steps_total counter\n")
+        lines.append(sample('css_fuzzer_steps_total', self.steps))
+
+        lines.append("# HELP css_fuzzer_phase_seconds_total Time spent per step phase\n"
+                     "# TYPE css_fuzzer_phase_seconds_total counter\n")
+        for phase, seconds in self.phase_totals.items():
+            lines.append(sample('css_fuzzer_phase_seconds_total', seconds, f'phase="{phase}"'))
+
+        def histograms(name, help_text, label, items):
+            lines.append(f"# HELP {name} {help_text}\n# TYPE {name} histogram\n")
+            for value, histogram in sorted(items):
+                cumulative = 0
+                for bound, count in zip(histogram.buckets + ('+Inf',), histogram.counts):
+                    cumulative += count
+                    lines.append(sample(f'{name}_bucket', cumulative, f'{label}="{value}",le="{bound}"'))
+                lines.append(sample(f'{name}_sum', histogram.sum, f'{label}="{value}"'))
+                lines.append(sample(f'{name}_count', histogram.count, f'{label}="{value}"'))
+
+        histograms('css_fuzzer_step_seconds', 'Step latency per action category', 'category', self.latency.items())
+        if self.vector_latency:
+            histograms('css_fuzzer_vector_step_seconds', 'Latency of a whole vector step per env count', 'envs',
+                       self.vector_latency.items())
+        return ''.join(lines)
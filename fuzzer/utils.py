@@ -1,21 +1,10 @@
 import math
-from collections import defaultdict
-import cssutils
-import logging
+from collections import OrderedDict, defaultdict, deque
 from bs4 import BeautifulSoup
-
-cssutils.log.setLevel(logging.CRITICAL)
+from css_parser import parse_css_dict
 
 def get_css_classes(css_content):
-    css = cssutils.parseString(css_content)
-    css_styles = {}
-    for rule in css:
-        if rule.type == rule.STYLE_RULE:
-            rules = []
-            for declaration in rule.style:
-                rules.append({'name':{declaration.name}, 'value':{declaration.value}})
-            css_styles[rule.selectorText] = rules
-    return css_styles
+    return parse_css_dict(css_content)
 
 def load_seed_html(seed_html_path):
     try:
@@ -41,4 +30,77 @@ def calculate_shannon_diversity(values):
             
     total = len(values)
     probabilities = [count/total for count in frequencies.values()]
-    return -sum(p * math.log2(p) for p in probabilities)
\ No newline at end of file
+    return -sum(p * math.log2(p) for p in probabilities)
+
+class LRUCache:
+    def __init__(self, capacity=4096):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self.entries)}
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class RollingHistory:
+    def __init__(self, window=50):
+        self.window = window
+        self.items = deque(maxlen=window)
+        self.counts = defaultdict(int)
+        self.plogp = [0.0] + [c * math.log2(c) for c in range(1, window + 1)]
+        self.weighted = 0.0
+        self.updates = 0
+
+    def append(self, value):
+        if len(self.items) == self.window:
+            self.discard(self.items[0])
+        self.items.append(value)
+        count = self.counts[value]
+        self.weighted += self.plogp[count + 1] - self.plogp[count]
+        self.counts[value] = count + 1
+
+        self.updates += 1
+        if self.updates % self.window == 0:
+            self.weighted = sum(self.plogp[c] for c in self.counts.values())
+
+    def discard(self, value):
+        count = self.counts[value]
+        self.weighted += self.plogp[count - 1] - self.plogp[count]
+        if count == 1:
+            del self.counts[value]
+        else:
+            self.counts[value] = count - 1
+
+    def extend(self, values):
+        for value in values:
+            self.append(value)
+
+    def entropy(self):
+        total = len(self.items)
+        if not total:
+            return 0
+        return max(0.0, math.log2(total) - self.weighted / total)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
@@ -0,0 +1,129 @@
+import hashlib
+import os
+import queue
+import sys
+import threading
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shared.file_index import atomic_write_bytes
+from shared.manifest import append_entries, file_hash
+
+def hashed_chunks(content, digest):
+    for chunk in content:
+        digest.update(chunk)
+        yield chunk
+
+def write_batch(jobs):
+    opened = {}
+    directories = set()
+    manifests = defaultdict(list)
+    digests = {}
+    hashed = {content[0] for kind, _, content in jobs if kind == 'manifest'}
+    try:
+        for kind, path, content in jobs:
+            if kind == 'manifest':
+                manifests[path].append(content)
+                continue
+            if callable(content):
+                content = content()
+            if isinstance(content, str):
+                content = content.encode('utf-8')
+            elif not isinstance(content, bytes):
+                content = (chunk.encode('utf-8') if isinstance(chunk, str) else chunk for chunk in content)
+            if path in hashed:
+                digest = digests[path] = hashlib.sha256()
+                if isinstance(content, bytes):
+                    digest.update(content)
+                else:
+                    content = hashed_chunks(content, digest)
+
+            directory = os.path.dirname(path)
+            if directory and directory not in directories:
+                os.makedirs(directory, exist_ok=True)
+                directories.add(directory)
+
+            if kind == 'atomic':
+                atomic_write_bytes(path, content if isinstance(content, bytes) else b''.join(content))
+                continue
+
+            handle = opened.get(path)
+            if kind == 'write' or handle is None:
+                if handle is not None:
+                    handle.close()
+                handle = opened[path] = open(path, 'wb' if kind == 'write' else 'ab')
+            if isinstance(content, bytes):
+                handle.write(content)
+            else:
+                handle.writelines(content)
+
+        for handle in opened.values():
+            handle.flush()
+            os.fsync(handle.fileno())
+    finally:
+        for handle in opened.values():
+            handle.close()
+
+    # Manifest entries are appended only once the files they point at are on disk.
+    for manifest_path, entries in manifests.items():
+        for variant_path, entry in entries:
+            digest = digests.get(variant_path)
+            entry['sha256'] = digest.hexdigest() if digest is not None else file_hash(variant_path)
+        append_entries(manifest_path, [entry for _, entry in entries])
+
+
+class VariantWriter:
+    def __init__(self, max_queue=256, batch_size=64):
+        self.batch_size = batch_size
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.error = None
+        self.thread = threading.Thread(target=self.run, name='variant-writer', daemon=True)
+        self.thread.start()
+
+    def submit(self, jobs):
+        if self.error is not None:
+            raise self.error
+        for job in jobs:
+            self.queue.put(job)
+
+    def run(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            jobs = [job for job in batch if job is not None]
+            try:
+                if jobs and self.error is None:
+                    write_batch(jobs)
+            except Exception as e:
+                self.error = e
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+            if len(jobs) < len(batch):
+                return
+
+    def flush(self):
+        self.queue.join()
+        if self.error is not None:
+            raise self.error
+
+    def close(self):
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -157,6 +157,33 @@ class HtmlConverter {
     console.log(`✓ Saved screenshot: ${outputPath}`);
   }
 
+  async setViewport(width, height) {
+    const viewport = this.page.viewport();
+    if (viewport && viewport.width === width && viewport.height === height) {
+      return;
+    }
+    await this.page.setViewport({
+      width,
+      height,
+      deviceScaleFactor: this.options.scale,
+    });
+  }
+
+  async renderFile(filePath, outputPath, width, height) {
+    try {
+      await this.setViewport(width, height);
+      await fs.mkdir(path.dirname(outputPath), { recursive: true });
+      const fileUrl = `file://${path.resolve(filePath)}`;
+      console.log(`\nProcessing: ${fileUrl}`);
+
+      await this.loadPage(fileUrl);
+      await this.takeScreenshot(outputPath);
+    } catch (error) {
+      console.error(`✗ Error processing ${path.basename(filePath)}:`, error.message);
+      throw error;
+    }
+  }
+
   async processDirectory(width, height) {
     try {
       const files = await fs.readdir(this.options.inputDir);
@@ -2,15 +2,10 @@ const path = require("path");
 const fs = require("fs").promises;
 const HtmlConverter = require("./html_converter");
 
-const VARIANT_DIMENSIONS = {
-  variants_1: { width: 412, height: 1036 },
-  variants_2: { width: 412, height: 958 },
-  variants_3: { width: 412, height: 1808 },
-  variants_4: { width: 412, height: 1072 },
-  variants_5: { width: 412, height: 1240 },
-  variants_6: { width: 412, height: 910 },
-  variants_7: { width: 412, height: 983 },
-};
+const VARIANT_DIMENSIONS = require("./variant_dimensions.json");
+const DEFAULT_DIMENSIONS = VARIANT_DIMENSIONS.variants_1;
+const MANIFEST_POLL_MS = 500;
+const RENDER_ATTEMPTS = 2;
 
 async function processVariant(mainDir, variant, dimensions) {
   const inputDir = path.join(mainDir, variant);
@@ -47,7 +42,186 @@ async function processVariant(mainDir, variant, dimensions) {
   }
 }
 
+async function readCursor(cursorPath) {
+  try {
+    const cursor = JSON.parse(await fs.readFile(cursorPath, "utf-8"));
+    return Number(cursor.offset) || 0;
+  } catch (error) {
+    return 0;
+  }
+}
+
+async function writeCursor(cursorPath, offset) {
+  const tmpPath = `${cursorPath}.tmp`;
+  await fs.writeFile(tmpPath, JSON.stringify({ offset }));
+  await fs.rename(tmpPath, cursorPath);
+}
+
+// Reads the complete lines appended since `offset`; each entry carries the offset just past its line.
+async function readManifest(manifestPath, offset) {
+  let handle;
+  try {
+    handle = await fs.open(manifestPath, "r");
+  } catch (error) {
+    if (error.code === "ENOENT") return { entries: [], offset };
+    throw error;
+  }
+
+  try {
+    const { size } = await handle.stat();
+    if (size < offset) offset = 0;
+    const buffer = Buffer.alloc(size - offset);
+    await handle.read(buffer, 0, buffer.length, offset);
+
+    const entries = [];
+    let start = 0;
+    let end = buffer.indexOf(0x0a);
+    while (end !== -1) {
+      try {
+        entries.push({ ...JSON.parse(buffer.toString("utf-8", start, end)), end: offset + end + 1 });
+      } catch (error) {
+        console.warn(`Skipping malformed manifest line at byte ${offset + start}`);
+      }
+      start = end + 1;
+      end = buffer.indexOf(0x0a, start);
+    }
+    return { entries, offset: offset + start };
+  } finally {
+    await handle.close();
+  }
+}
+
+async function readFailed(failedPath) {
+  let data;
+  try {
+    data = await fs.readFile(failedPath, "utf-8");
+  } catch (error) {
+    if (error.code === "ENOENT") return [];
+    throw error;
+  }
+  const entries = [];
+  for (const line of data.split("\n")) {
+    if (!line) continue;
+    try {
+      entries.push(JSON.parse(line));
+    } catch (error) {
+      console.warn(`Skipping malformed line in ${failedPath}`);
+    }
+  }
+  return entries;
+}
+
+async function writeFailed(failedPath, entries) {
+  if (entries.length === 0) {
+    await fs.rm(failedPath, { force: true });
+    return;
+  }
+  const tmpPath = `${failedPath}.tmp`;
+  await fs.writeFile(tmpPath, entries.map((entry) => JSON.stringify(entry) + "\n").join(""));
+  await fs.rename(tmpPath, failedPath);
+}
+
+async function renderEntry(converter, entry, baseDir, outputRoot) {
+  const filePath = path.resolve(baseDir, entry.path);
+  const { width, height } =
+    entry.viewport || VARIANT_DIMENSIONS[String(entry.seed).split("/")[0]] || DEFAULT_DIMENSIONS;
+  const outputPath = path.join(
+    outputRoot,
+    path.relative(baseDir, path.dirname(filePath)),
+    `${path.parse(filePath).name}.png`
+  );
+  for (let attempt = 1; attempt <= RENDER_ATTEMPTS; attempt++) {
+    try {
+      await converter.renderFile(filePath, outputPath, width, height);
+      return true;
+    } catch (error) {
+      if (attempt < RENDER_ATTEMPTS) console.log(`Retrying ${entry.path}`);
+    }
+  }
+  return false;
+}
+
+async function processManifest(manifestPath, outputRoot, { follow = false, idleTimeout = 60 } = {}) {
+  const baseDir = path.dirname(path.resolve(manifestPath));
+  const cursorPath = `${manifestPath}.cursor`;
+  const failedPath = `${manifestPath}.failed`;
+  let offset = await readCursor(cursorPath);
+
+  const converter = new HtmlConverter({
+    inputDir: baseDir,
+    outputDir: outputRoot,
+    imageFormat: "png",
+    quality: 100,
+    scale: 2,
+    port: 3000,
+  });
+  await converter.initialize(DEFAULT_DIMENSIONS.width, DEFAULT_DIMENSIONS.height);
+
+  let rendered = 0;
+  let failed = 0;
+  let idleSince = Date.now();
+  try {
+    // Entries that failed on an earlier run are retried before reading past the cursor.
+    const remaining = [];
+    for (const entry of await readFailed(failedPath)) {
+      if (await renderEntry(converter, entry, baseDir, outputRoot)) rendered++;
+      else remaining.push(entry);
+    }
+    await writeFailed(failedPath, remaining);
+    failed = remaining.length;
+
+    while (true) {
+      const batch = await readManifest(manifestPath, offset);
+      for (const { end, ...entry } of batch.entries) {
+        if (await renderEntry(converter, entry, baseDir, outputRoot)) {
+          rendered++;
+        } else {
+          // Recorded before the cursor moves past it, so a failed entry is never dropped.
+          await fs.appendFile(failedPath, JSON.stringify(entry) + "\n");
+          failed++;
+        }
+        await writeCursor(cursorPath, end);
+      }
+
+      if (batch.offset !== offset) {
+        offset = batch.offset;
+        await writeCursor(cursorPath, offset);
+      }
+      if (batch.entries.length > 0) {
+        idleSince = Date.now();
+      } else if (!follow || Date.now() - idleSince >= idleTimeout * 1000) {
+        break;
+      } else {
+        await new Promise((resolve) => setTimeout(resolve, MANIFEST_POLL_MS));
+      }
+    }
+  } finally {
+    await converter.close();
+  }
+
+  console.log(`Rendered ${rendered} variants from ${manifestPath}`);
+  if (failed > 0) console.log(`${failed} variants failed to render; they are retried from ${failedPath} on the next run`);
+}
+
+function parseArgs(argv) {
+  const args = { manifest: null, output: null, follow: false, idleTimeout: 60 };
+  for (let i = 0; i < argv.length; i++) {
+    if (argv[i] === "--manifest") args.manifest = argv[++i];
+    else if (argv[i] === "--output") args.output = argv[++i];
+    else if (argv[i] === "--follow") args.follow = true;
+    else if (argv[i] === "--idle-timeout") args.idleTimeout = Number(argv[++i]);
+  }
+  return args;
+}
+
 async function main() {
+  const args = parseArgs(process.argv.slice(2));
+  if (args.manifest) {
+    const outputRoot = args.output || path.join(path.dirname(path.resolve(args.manifest)), "output");
+    await processManifest(args.manifest, outputRoot, args);
+    return;
+  }
+
   const mainDirectories = ["/path/to/root/directory"];
   const variants = Object.keys(VARIANT_DIMENSIONS);
 
@@ -64,4 +238,4 @@ if (require.main === module) {
   main().catch(console.error);
 }
 
-module.exports = { processVariant, VARIANT_DIMENSIONS };
+module.exports = { processVariant, processManifest, readManifest, VARIANT_DIMENSIONS };
@@ -0,0 +1,9 @@
+from .component_occlusion import HTMLComponentOverlapGenerator
+from .emotive_font import FontVariantGenerator
+from .geometric_background import GeometricBackgroundGenerator
+from .language import SimpleHTMLTranslator
+from .pipeline import TRANSFORMATIONS, run_pipeline
+from .seed import Seed, VariantGenerator, find_seeds, render_page
+from .text_emoji import EmojiInjectionGenerator
+from .text_overlap import AllTextOverlapGenerator
+from .translation import DictionaryBackend, GoogleBackend, TranslationBackend, TranslationMemo, Translator
@@ -0,0 +1,60 @@
+import argparse
+import json
+import os
+from .emotive_font import FONTS_PATH as EMOTIVE_FONTS_PATH
+from .language import FONTS_PATH as LANGUAGE_FONTS_PATH
+from .pipeline import TRANSFORMATIONS, run_pipeline
+from .text_emoji import EMOJI_FONT_PATH
+from .translation import BACKENDS, MEMO_PATH
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Apply metamorphic transformations to seed or fuzzer HTML")
+    parser.add_argument('inputs', nargs='+', help="HTML files or directories searched recursively")
+    parser.add_argument('--output', default='transformed')
+    parser.add_argument('--transformations', nargs='+', choices=sorted(TRANSFORMATIONS),
+                        default=sorted(TRANSFORMATIONS))
+    parser.add_argument('--variants', type=int, default=200, help="variants per seed and transformation")
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--base-seed', type=int, default=0)
+    parser.add_argument('--emotive-fonts-path', default=EMOTIVE_FONTS_PATH)
+    parser.add_argument('--language-fonts-path', default=LANGUAGE_FONTS_PATH)
+    parser.add_argument('--emoji-font', default=EMOJI_FONT_PATH)
+    parser.add_argument('--translation-backend', choices=sorted(BACKENDS), default='google')
+    parser.add_argument('--translation-dictionary',
+                        help="JSON file of {language code: {text: translation}} for the dictionary backend")
+    parser.add_argument('--translation-memo', default=MEMO_PATH,
+                        help="SQLite file that remembers every translation across runs")
+    parser.add_argument('--manifest',
+                        help="append every written variant to this JSONL manifest so a renderer can tail it")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    options = {
+        'emotive_font': {'base_path': args.emotive_fonts_path},
+        'language': {'fonts_path': args.language_fonts_path, 'backend': args.translation_backend,
+                     'dictionary_path': args.translation_dictionary, 'memo_path': args.translation_memo},
+        'text_emoji': {'font_path': args.emoji_font},
+    }
+    summaries = run_pipeline(args.inputs, args.output, args.transformations, args.variants, args.workers,
+                             args.base_seed, options, manifest=args.manifest)
+
+    os.makedirs(args.output, exist_ok=True)
+    with open(os.path.join(args.output, 'transform_summary.json'), 'w', encoding='utf-8') as f:
+        json.dump(summaries, f, indent=2)
+
+    totals = {}
+    for summary in summaries:
+        for name, count in summary.get('variants', {}).items():
+            totals[name] = totals.get(name, 0) + count
+    for name, count in sorted(totals.items()):
+        print(f"{name}: {count} variants")
+    failed = sum(1 for summary in summaries if 'error' in summary)
+    if failed:
+        print(f"{failed} seed(s) failed")
+
+
+if __name__ == "__main__":
+    main()
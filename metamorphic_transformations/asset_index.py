@@ -0,0 +1,64 @@
+import hashlib
+import json
+import os
+from shared.file_index import load_index
+from .seed import CACHE_DIR, get_font_files
+
+try:
+    import emoji
+except ImportError:
+    emoji = None
+
+_indices = {}
+
+
+def index_path(kind, key):
+    digest = hashlib.sha1(f"{kind}:{key}".encode()).hexdigest()[:16]
+    return os.path.join(CACHE_DIR, f"assets_{kind}_{digest}.json")
+
+
+def get_index(kind, key, scan):
+    if (kind, key) not in _indices:
+        _indices[(kind, key)] = load_index(index_path(kind, key), key, scan)
+    return _indices[(kind, key)]
+
+
+def scan_fonts(root):
+    families = {}
+    directories = [root]
+    if os.path.isdir(root):
+        for item in sorted(os.listdir(root)):
+            item_path = os.path.join(root, item)
+            if os.path.isdir(item_path):
+                directories.append(item_path)
+                font_files = get_font_files(item_path + '/')
+                if font_files:
+                    families[item] = font_files
+    return families, directories
+
+
+def get_font_index(root):
+    root = os.path.abspath(root)
+    return get_index('fonts', root, lambda: scan_fonts(root))
+
+
+def scan_emoji(categories):
+    all_emojis = list(emoji.EMOJI_DATA.keys())
+    names = [emoji.demojize(e).lower() for e in all_emojis]
+
+    emoji_cats = {}
+    for category, (words, limit) in categories.items():
+        emoji_cats[category] = [e for e, name in zip(all_emojis, names)
+                                if any(word in name for word in words)][:limit]
+    return {'emojis': all_emojis, 'categories': emoji_cats}, [os.path.dirname(emoji.__file__)]
+
+
+def get_emoji_index(categories):
+    if emoji is None:
+        raise ImportError("emoji is required for the emoji index")
+    key = json.dumps([getattr(emoji, '__version__', ''), categories], sort_keys=True)
+    return get_index('emoji', key, lambda: scan_emoji(categories))
+
+
+def clear_indices():
+    _indices.clear()
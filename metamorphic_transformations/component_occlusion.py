@@ -0,0 +1,204 @@
+import random
+from .seed import VariantGenerator
+
+COMPONENT_TYPES = {
+    '.filter-chip-01': 'chip',
+    '.filter-chip-02': 'selected-chip',
+    '.card-01': 'card',
+    '.button-1': 'button',
+    '.button-2': 'icon-button',
+    '.nav-item-1': 'nav-item',
+    '.nav-item-2': 'nav-item',
+    '.icon': 'icon',
+    '.image-icon': 'image',
+    '.selected-icon': 'small-icon',
+    '.top-app-bar': 'header',
+    '.status-bar': 'status',
+    '.navigation-bar': 'navbar',
+    '.gesture-bar': 'gesture'
+}
+
+
+class HTMLComponentOverlapGenerator(VariantGenerator):
+    name = 'component_occlusion'
+    prefix = 'comp_overlap'
+    title = 'Component Overlap Variant'
+
+    def __init__(self):
+        self.offsets = [
+            {'x': 5, 'y': 5}, {'x': 10, 'y': 0}, {'x': 0, 'y': 10},
+            {'x': -5, 'y': 5}, {'x': 5, 'y': -5}, {'x': 15, 'y': 5},
+            {'x': 0, 'y': 15}, {'x': 10, 'y': 10}, {'x': -10, 'y': 0},
+            {'x': 20, 'y': 0}, {'x': 0, 'y': 20}, {'x': -15, 'y': -5}
+        ]
+
+        self.opacity_vals = [0.5, 0.6, 0.7, 0.8, 0.9]
+        self.scale_vals = [0.8, 0.9, 1.0, 1.1, 1.2]
+
+    def find_components(self, index):
+        return [element for selector in COMPONENT_TYPES for element in index.select(selector)]
+
+    def get_type(self, selector):
+        return COMPONENT_TYPES.get(selector, 'component')
+
+    def make_variant(self, seed, variant_id):
+        if variant_id % 5 == 0:
+            return ('extreme',) + self.make_extreme_variant(seed, variant_id)
+        if variant_id % 5 == 1:
+            return ('mixed',) + self.make_mixed_variant(seed, variant_id)
+        return ('normal',) + self.make_overlap_variant(seed, variant_id)
+
+    def make_overlap_variant(self, seed, variant_id):
+        edit = seed.edit()
+        components = self.find_components(seed.index)
+
+        if len(components) == 0:
+            return seed.html, seed.css
+
+        overlap_css = ""
+
+        for comp_idx, target_component in enumerate(components):
+
+            container_id = f"comp-container-{variant_id}-{comp_idx}"
+            original_id = f"comp-original-{variant_id}-{comp_idx}"
+
+            edit.set_attribute(target_component, 'id', original_id)
+            edit.wrap(target_component, 'div', id=container_id, style="position: relative; display: inline-block;")
+
+            num_overlaps = random.randint(1, 4)
+
+            for overlap_idx in range(num_overlaps):
+                overlap_id = f"comp-overlap-{variant_id}-{comp_idx}-{overlap_idx}"
+                offset = random.choice(self.offsets)
+                opacity = random.choice(self.opacity_vals)
+                scale = random.choice(self.scale_vals)
+
+                edit.insert_after(target_component, edit.tag('div', seed.index.source(target_component), id=overlap_id))
+
+                overlap_css += f"""
+#{overlap_id} {{
+    position: absolute !important;
+    top: {offset['y'] + overlap_idx * 2}px !important;
+    left: {offset['x'] + overlap_idx * 2}px !important;
+    z-index: {300 + overlap_idx} !important;
+    opacity: {opacity} !important;
+    transform: scale({scale}) !important;
+    pointer-events: none !important;
+    filter: blur({overlap_idx * 0.5}px) !important;
+}}
+"""
+
+        overlap_css += f"""
+[id^="comp-container-{variant_id}-"] {{
+    position: relative !important;
+    display: inline-block !important;
+}}
+
+[id^="comp-original-{variant_id}-"] {{
+    position: relative !important;
+    z-index: 1 !important;
+}}
+"""
+
+        return edit.render(), seed.css + "\n\n" + overlap_css
+
+    def make_extreme_variant(self, seed, variant_id):
+        edit = seed.edit()
+        components = self.find_components(seed.index)
+
+        if len(components) == 0:
+            return seed.html, seed.css
+
+        overlap_css = ""
+
+        for comp_idx, target_component in enumerate(components):
+
+            container_id = f"extreme-comp-container-{variant_id}-{comp_idx}"
+            original_id = f"extreme-comp-original-{variant_id}-{comp_idx}"
+
+            edit.set_attribute(target_component, 'id', original_id)
+            edit.wrap(target_component, 'div', id=container_id, style="position: relative; display: inline-block;")
+
+            num_overlaps = random.randint(3, 6)
+
+            for overlap_idx in range(num_overlaps):
+                overlap_id = f"extreme-comp-overlap-{variant_id}-{comp_idx}-{overlap_idx}"
+
+                offset_x = random.randint(-20, 20)
+                offset_y = random.randint(-20, 20)
+                opacity = random.uniform(0.3, 0.8)
+                scale = random.uniform(0.7, 1.3)
+                rotation = random.randint(-10, 10)
+
+                edit.insert_after(target_component, edit.tag('div', seed.index.source(target_component), id=overlap_id))
+
+                overlap_css += f"""
+#{overlap_id} {{
+    position: absolute !important;
+    top: {offset_y}px !important;
+    left: {offset_x}px !important;
+    z-index: {500 + overlap_idx} !important;
+    opacity: {opacity} !important;
+    transform: scale({scale}) rotate({rotation}deg) !important;
+    pointer-events: none !important;
+    filter: blur({overlap_idx * 0.8}px) sepia({overlap_idx * 20}%) !important;
+}}
+"""
+
+        overlap_css += f"""
+[id^="extreme-comp-container-{variant_id}-"] {{
+    position: relative !important;
+    display: inline-block !important;
+}}
+
+[id^="extreme-comp-original-{variant_id}-"] {{
+    position: relative !important;
+    z-index: 1 !important;
+}}
+"""
+
+        return edit.render(), seed.css + "\n\n" + overlap_css
+
+    def make_mixed_variant(self, seed, variant_id):
+        edit = seed.edit()
+        components = self.find_components(seed.index)
+
+        if len(components) == 0:
+            return seed.html, seed.css
+
+        overlap_css = ""
+        mixed_containers = []
+
+        num_mixed = min(5, len(components))
+        selected = random.sample(range(len(components)), num_mixed)
+
+        for mix_idx, source_idx in enumerate(selected):
+            target_idx = random.choice([i for i in range(len(components)) if i != source_idx])
+            target_element = components[target_idx]
+
+            mixed_id = f"mixed-overlap-{variant_id}-{mix_idx}"
+            container_id = f"mixed-container-{variant_id}-{mix_idx}"
+
+            if not any(c is target_element or seed.index.contains(c, target_element) for c in mixed_containers):
+                edit.wrap(target_element, 'div', id=container_id, style="position: relative; display: inline-block;")
+                mixed_containers.append(target_element)
+
+            edit.insert_after(target_element,
+                              edit.tag('div', seed.index.source(components[source_idx]), id=mixed_id))
+
+            offset = random.choice(self.offsets)
+            opacity = random.choice(self.opacity_vals)
+
+            overlap_css += f"""
+#{mixed_id} {{
+    position: absolute !important;
+    top: {offset['y']}px !important;
+    left: {offset['x']}px !important;
+    z-index: 800 !important;
+    opacity: {opacity} !important;
+    pointer-events: none !important;
+    transform: scale(0.8) !important;
+}}
+"""
+
+        return edit.render(), seed.css + "\n\n" + overlap_css
@@ -0,0 +1,202 @@
+from collections import defaultdict
+from bs4.dammit import EntitySubstitution
+from bs4.element import CharsetMetaAttributeValue, ContentMetaAttributeValue, NavigableString, Tag
+
+META_VALUES = (CharsetMetaAttributeValue, ContentMetaAttributeValue)
+
+
+class ElementSpan:
+    __slots__ = ('id', 'name', 'attrs', 'classes', 'parent', 'start', 'open_end', 'close_start', 'end', 'text')
+
+    def __init__(self, id, name, attrs, parent, start):
+        self.id = id
+        self.name = name
+        self.attrs = attrs
+        self.classes = attrs.get('class', [])
+        self.parent = parent
+        self.start = start
+        self.open_end = start
+        self.close_start = start
+        self.end = start
+        self.text = ''
+
+
+class TextSpan:
+    __slots__ = ('text', 'parent', 'parent_name', 'start', 'end')
+
+    def __init__(self, text, parent, parent_name, start, end):
+        self.text = text
+        self.parent = parent
+        self.parent_name = parent_name
+        self.start = start
+        self.end = end
+
+
+class DOMIndex:
+    def __init__(self, soup):
+        self.builder = soup.builder
+        self.elements = []
+        self.strings = []
+        self.by_class = defaultdict(list)
+        self.by_tag = defaultdict(list)
+        self.chunks = []
+        self.position = 0
+        for child in soup.contents:
+            self.visit(child, None, soup.name)
+        self.html = ''.join(self.chunks)
+        del self.chunks
+
+    def emit(self, text):
+        self.chunks.append(text)
+        self.position += len(text)
+
+    def visit(self, node, parent, parent_name):
+        if isinstance(node, NavigableString):
+            start = self.position
+            self.emit(node.output_ready('minimal'))
+            self.strings.append(TextSpan(str(node), parent, parent_name, start, self.position))
+            return
+
+        element = ElementSpan(len(self.elements), node.name, dict(node.attrs), parent, self.position)
+        self.elements.append(element)
+        self.by_tag[node.name].append(element.id)
+        for class_name in dict.fromkeys(element.classes):
+            self.by_class[class_name].append(element.id)
+
+        open_tag, close_tag = self.render_tag(node.name, element.attrs, bool(node.contents))
+        self.emit(open_tag)
+        element.open_end = self.position
+        for child in node.contents:
+            self.visit(child, element.id, node.name)
+        element.close_start = self.position
+        self.emit(close_tag)
+        element.end = self.position
+        element.text = node.get_text(strip=True)
+
+    def render_tag(self, name, attrs, has_contents=True):
+        parts = [name]
+        for key, value in sorted(attrs.items()):
+            if value is None:
+                parts.append(key)
+                continue
+            if isinstance(value, META_VALUES):
+                return self.render_scratch_tag(name, attrs, has_contents)
+            if isinstance(value, (list, tuple)):
+                value = ' '.join(value)
+            parts.append(f"{key}={quote_attribute(str(value))}")
+        if not has_contents and self.builder.can_be_empty_element(name):
+            return f"<{' '.join(parts)}/>", ''
+        return f"<{' '.join(parts)}>", f"</{name}>"
+
+    def render_scratch_tag(self, name, attrs, has_contents):
+        scratch = Tag(builder=self.builder, name=name, attrs=attrs)
+        if has_contents:
+            scratch.append('')
+        html = scratch.decode()
+        close_tag = f"</{name}>"
+        if html.endswith(close_tag):
+            return html[:-len(close_tag)], close_tag
+        return html, ''
+
+    def select(self, selector):
+        if selector.startswith('.'):
+            return [self.elements[i] for i in self.by_class.get(selector[1:], [])]
+        return [self.elements[i] for i in self.by_tag.get(selector, [])]
+
+    def find(self, name, class_name=None):
+        ids = self.by_tag.get(name, [])
+        if class_name is not None:
+            ids = [i for i in ids if class_name in self.elements[i].classes]
+        return self.elements[ids[0]] if ids else None
+
+    def source(self, element):
+        return self.html[element.start:element.end]
+
+    def contains(self, outer, inner):
+        return outer.open_end <= inner.start and inner.end <= outer.close_start
+
+
+def escape_text(text):
+    return EntitySubstitution.substitute_xml(text)
+
+
+def quote_attribute(value):
+    return EntitySubstitution.quoted_attribute_value(EntitySubstitution.substitute_xml(value))
+
+
+class HTMLEdit:
+    def __init__(self, index):
+        self.index = index
+        self.attrs = {}
+        self.wraps = defaultdict(list)
+        self.after = defaultdict(list)
+        self.prepended = defaultdict(list)
+        self.contents = {}
+        self.strings = {}
+
+    def get(self, element, name, default=None):
+        return self.attrs.get(element.id, element.attrs).get(name, default)
+
+    def set_attribute(self, element, name, value):
+        attrs = self.attrs.get(element.id)
+        if attrs is None:
+            attrs = self.attrs[element.id] = dict(element.attrs)
+        attrs[name] = value
+
+    def wrap(self, element, name, **attrs):
+        open_tag, close_tag = self.index.render_tag(name, attrs)
+        self.wraps[element.id].append((open_tag, close_tag))
+
+    def insert_after(self, element, html):
+        self.after[element.id].append(html)
+
+    def prepend(self, element, html):
+        self.prepended[element.id].append(html)
+
+    def set_text(self, element, text):
+        self.contents[element.id] = escape_text(text)
+
+    def replace_string(self, string_id, text):
+        self.strings[string_id] = escape_text(text)
+
+    def tag(self, name, inner='', **attrs):
+        open_tag, close_tag = self.index.render_tag(name, attrs, bool(inner))
+        return open_tag + inner + close_tag
+
+    def render(self):
+        elements = self.index.elements
+        edits = []
+        for element_id, attrs in self.attrs.items():
+            element = elements[element_id]
+            open_tag = self.index.render_tag(element.name, attrs, element.open_end != element.close_start)[0]
+            edits.append((element.start, 3, element.open_end, open_tag, element))
+        for element_id, wraps in self.wraps.items():
+            element = elements[element_id]
+            edits.append((element.start, 2, element.start, ''.join(open_tag for open_tag, _ in wraps), element))
+        for element_id in self.wraps.keys() | self.after.keys():
+            element = elements[element_id]
+            closes = ''.join(close_tag for _, close_tag in reversed(self.wraps.get(element_id, [])))
+            edits.append((element.end, 0, element.end, ''.join(reversed(self.after.get(element_id, []))) + closes,
+                          element))
+        for element_id, html in self.prepended.items():
+            element = elements[element_id]
+            edits.append((element.open_end, 1, element.open_end, ''.join(reversed(html)), element))
+        for element_id, html in self.contents.items():
+            element = elements[element_id]
+            edits.append((element.open_end, 3, element.close_start, html, element))
+        for string_id, html in self.strings.items():
+            string = self.index.strings[string_id]
+            edits.append((string.start, 3, string.end, html, None))
+
+        replaced = [elements[element_id] for element_id in self.contents]
+        source = self.index.html
+        chunks = []
+        cursor = 0
+        for start, _, end, html, owner in sorted(edits, key=lambda edit: edit[:2]):
+            if start < cursor or (owner is not None and any(self.index.contains(outer, owner) for outer in replaced)):
+                continue
+            chunks.append(source[cursor:start])
+            chunks.append(html)
+            cursor = end
+        chunks.append(source[cursor:])
+        return ''.join(chunks)
@@ -0,0 +1,116 @@
+import os
+import random
+from .asset_index import get_font_index
+from .seed import VariantGenerator, find_text_elements, font_face_css
+
+FONTS_PATH = '/Users/promachowdhury/emotive_fonts/'
+
+
+class FontVariantGenerator(VariantGenerator):
+    name = 'emotive_font'
+    prefix = 'font'
+    title = 'Font Variant'
+
+    def __init__(self, base_path=FONTS_PATH):
+        self.base_path = base_path
+        self.font_folders = []
+        self.font_names = []
+        self.font_files = []
+        self.discover_fonts()
+        self.font_css = [self.make_font_css(i) for i in range(len(self.font_folders))]
+        self.all_font_css = ''.join(self.font_css)
+        self.family_lists = [self.font_families(i) for i in range(len(self.font_folders))]
+
+    def discover_fonts(self):
+        for item, font_files in get_font_index(self.base_path).items():
+            self.font_folders.append(os.path.join(self.base_path, item) + '/')
+            self.font_names.append(item)
+            self.font_files.append(font_files)
+
+    def make_font_css(self, font_index):
+        font_folder = self.font_folders[font_index]
+        font_name = self.font_names[font_index]
+        return ''.join(font_face_css(f"{font_name}-family-{i+1}", f"{font_folder}{font_file}")
+                       for i, font_file in enumerate(self.font_files[font_index]))
+
+    def font_families(self, font_index):
+        font_name = self.font_names[font_index]
+        return [f"'{font_name}-family-{i+1}'" for i in range(len(self.font_files[font_index]))]
+
+    def text_rule(self, element_id, font_family_list):
+        return f"""
+#{element_id} {{
+    font-family: {font_family_list}, sans-serif !important;
+    font-size: inherit !important;
+    font-weight: inherit !important;
+}}
+"""
+
+    def variant_ids(self, num_variants):
+        return range(num_variants) if self.font_folders else range(0)
+
+    def make_variant(self, seed, variant_id):
+        if variant_id % 7 == 0:
+            font_index = (variant_id // 7) % len(self.font_folders)
+            return (f'single_{self.font_names[font_index]}',) + \
+                self.make_single_font_variant(seed, font_index, variant_id)
+        if variant_id % 7 == 1:
+            return ('mixed',) + self.make_mixed_variant(seed, variant_id)
+        return ('random',) + self.make_random_variant(seed, variant_id)
+
+    def make_single_font_variant(self, seed, font_index, variant_id):
+        edit = seed.edit()
+        text_elements = find_text_elements(seed.index)
+
+        if len(text_elements) == 0:
+            return seed.html, seed.css
+
+        font_css = self.font_css[font_index]
+        font_family_list = ', '.join(self.family_lists[font_index])
+
+        for elem_idx, element in enumerate(text_elements):
+            element_id = f"font-text-{variant_id}-{elem_idx}"
+            edit.set_attribute(element, 'id', element_id)
+            font_css += self.text_rule(element_id, font_family_list)
+
+        return edit.render(), seed.css + "\n\n" + font_css
+
+    def make_mixed_variant(self, seed, variant_id):
+        edit = seed.edit()
+        text_elements = find_text_elements(seed.index)
+
+        if len(text_elements) == 0:
+            return seed.html, seed.css
+
+        all_font_css = self.all_font_css
+
+        for elem_idx, element in enumerate(text_elements):
+            font_index = random.randint(0, len(self.font_folders) - 1)
+            element_id = f"mixed-font-text-{variant_id}-{elem_idx}"
+            edit.set_attribute(element, 'id', element_id)
+            all_font_css += self.text_rule(element_id, ', '.join(self.family_lists[font_index]))
+
+        return edit.render(), seed.css + "\n\n" + all_font_css
+
+    def make_random_variant(self, seed, variant_id):
+        edit = seed.edit()
+        text_elements = find_text_elements(seed.index)
+
+        if len(text_elements) == 0:
+            return seed.html, seed.css
+
+        all_font_css = self.all_font_css
+
+        for elem_idx, element in enumerate(text_elements):
+            num_fonts = min(random.randint(1, 3), len(self.font_folders))
+            selected_font_indices = random.sample(range(len(self.font_folders)), num_fonts)
+
+            element_id = f"random-font-text-{variant_id}-{elem_idx}"
+            edit.set_attribute(element, 'id', element_id)
+
+            font_families = []
+            for font_idx in selected_font_indices:
+                font_families.extend(self.family_lists[font_idx])
+            all_font_css += self.text_rule(element_id, ', '.join(font_families))
+
+        return edit.render(), seed.css + "\n\n" + all_font_css
@@ -0,0 +1,299 @@
+import random
+from .seed import VariantGenerator
+
+BACKGROUND_CSS = """
+.geometric-background {
+    position: absolute !important;
+    top: 0 !important;
+    left: 0 !important;
+    width: 100% !important;
+    height: 100% !important;
+    overflow: hidden !important;
+    z-index: -10 !important;
+    pointer-events: none !important;
+}
+
+.exampleslibrary-mobile {
+    position: relative !important;
+    z-index: 1 !important;
+}
+
+.status-bar, .top-app-bar, .filter-chips-carousel, .sorting-controls, 
+.card-grid, .navigation-bar, .gesture-bar {
+    position: relative !important;
+    z-index: 2 !important;
+}
+"""
+
+
+class GeometricBackgroundGenerator(VariantGenerator):
+    name = 'geometric_background'
+    prefix = 'geo_bg'
+    title = 'Geometric Background Variant'
+
+    def __init__(self):
+        self.shapes = ['square', 'circle', 'triangle', 'rectangle', 'diamond', 'hexagon', 'oval', 'star', 'cross', 'arrow']
+        self.colors = ['#ff0000', '#00ff00', '#0000ff', '#ff00ff', '#ffff00', '#00ffff', '#ffa500', '#800080', '#ffc0cb', '#90ee90', '#ff6347', '#4169e1', '#32cd32', '#ff1493', '#00ced1', '#ffd700', '#dc143c', '#9370db']
+        self.patterns = ['solid', 'gradient', 'stripes', 'dots', 'border-only', 'dashed']
+        self.shape_css = {
+            'square': self.square_css, 'circle': self.circle_css, 'triangle': self.triangle_css,
+            'rectangle': self.rect_css, 'diamond': self.diamond_css, 'hexagon': self.hex_css,
+            'oval': self.oval_css, 'star': self.star_css, 'cross': self.cross_css, 'arrow': self.arrow_css
+        }
+
+    def generate_shapes(self, count=50):
+        shapes = []
+        for i in range(count):
+            shape = {
+                'id': f'geo-shape-{i}',
+                'type': random.choice(self.shapes),
+                'x': random.randint(0, 100),
+                'y': random.randint(0, 100),
+                'size': random.randint(30, 200),
+                'color': random.choice(self.colors),
+                'opacity': random.uniform(0.4, 0.8),
+                'rotation': random.randint(0, 360),
+                'pattern': random.choice(self.patterns),
+                'z_index': random.randint(-50, -10)
+            }
+            shapes.append(shape)
+        return shapes
+
+    def make_shape_html(self, edit, shape):
+        shape_type = shape['type'] if shape['type'] in self.shape_css else 'square'
+        return edit.tag('div', id=shape['id'], **{'class': f'geo-{shape_type}'})
+
+    def get_shape_css(self, shape):
+        shape_id = shape['id']
+        base_size = shape['size']
+
+        base_css = f"""
+#{shape_id} {{
+    position: absolute;
+    top: {shape['y']}%;
+    left: {shape['x']}%;
+    width: {base_size}px;
+    height: {base_size}px;
+    opacity: {shape['opacity']};
+    z-index: {shape['z_index']};
+    transform: rotate({shape['rotation']}deg);
+    pointer-events: none;
+}}
+"""
+        extra_css = self.shape_css.get(shape['type'], self.square_css)(shape_id, shape)
+        return base_css + extra_css
+
+    def square_css(self, shape_id, shape):
+        if shape['pattern'] == 'gradient':
+            bg = f"background: linear-gradient(45deg, {shape['color']}, {random.choice(self.colors)});"
+        elif shape['pattern'] == 'stripes':
+            bg = f"background: repeating-linear-gradient(45deg, {shape['color']}, {shape['color']} 10px, transparent 10px, transparent 20px);"
+        elif shape['pattern'] == 'dots':
+            bg = f"background: radial-gradient(circle, {shape['color']} 30%, transparent 30%);"
+        elif shape['pattern'] == 'border-only':
+            bg = f"border: 3px solid {shape['color']}; background: transparent;"
+        elif shape['pattern'] == 'dashed':
+            bg = f"border: 3px dashed {shape['color']}; background: transparent;"
+        else:
+            bg = f"background: {shape['color']};"
+
+        return f"""
+#{shape_id} {{
+    {bg}
+}}
+"""
+
+    def circle_css(self, shape_id, shape):
+        if shape['pattern'] == 'gradient':
+            bg = f"background: radial-gradient(circle, {shape['color']}, {random.choice(self.colors)});"
+        elif shape['pattern'] == 'border-only':
+            bg = f"border: 3px solid {shape['color']}; background: transparent;"
+        elif shape['pattern'] == 'dashed':
+            bg = f"border: 3px dashed {shape['color']}; background: transparent;"
+        else:
+            bg = f"background: {shape['color']};"
+
+        return f"""
+#{shape_id} {{
+    border-radius: 50%;
+    {bg}
+}}
+"""
+
+    def triangle_css(self, shape_id, shape):
+        size = shape['size']
+        return f"""
+#{shape_id} {{
+    width: 0;
+    height: 0;
+    border-left: {size//2}px solid transparent;
+    border-right: {size//2}px solid transparent;
+    border-bottom: {size}px solid {shape['color']};
+}}
+"""
+
+    def rect_css(self, shape_id, shape):
+        width = shape['size'] * random.uniform(1.5, 3.0)
+        if shape['pattern'] == 'gradient':
+            bg = f"background: linear-gradient(90deg, {shape['color']}, {random.choice(self.colors)});"
+        else:
+            bg = f"background: {shape['color']};"
+
+        return f"""
+#{shape_id} {{
+    width: {width}px;
+    {bg}
+}}
+"""
+
+    def diamond_css(self, shape_id, shape):
+        return f"""
+#{shape_id} {{
+    background: {shape['color']};
+    transform: rotate({shape['rotation'] + 45}deg);
+}}
+"""
+
+    def hex_css(self, shape_id, shape):
+        size = shape['size']
+        return f"""
+#{shape_id} {{
+    width: {size}px;
+    height: {size * 0.866}px;
+    background: {shape['color']};
+    position: relative;
+    margin: {size * 0.433}px 0;
+}}
+
+#{shape_id}:before,
+#{shape_id}:after {{
+    content: "";
+    position: absolute;
+    width: 0;
+    border-left: {size//2}px solid transparent;
+    border-right: {size//2}px solid transparent;
+}}
+
+#{shape_id}:before {{
+    bottom: 100%;
+    border-bottom: {size * 0.433}px solid {shape['color']};
+}}
+
+#{shape_id}:after {{
+    top: 100%;
+    border-top: {size * 0.433}px solid {shape['color']};
+}}
+"""
+
+    def oval_css(self, shape_id, shape):
+        width = shape['size'] * random.uniform(1.5, 2.5)
+        return f"""
+#{shape_id} {{
+    width: {width}px;
+    border-radius: 50%;
+    background: {shape['color']};
+}}
+"""
+
+    def star_css(self, shape_id, shape):
+        size = shape['size']
+        return f"""
+#{shape_id} {{
+    position: relative;
+    display: inline-block;
+    color: {shape['color']};
+    width: 0px;
+    height: 0px;
+    border-left: {size//3}px solid transparent;
+    border-right: {size//3}px solid transparent;
+    border-bottom: {size//2}px solid {shape['color']};
+    transform: rotate(35deg);
+}}
+
+#{shape_id}:before {{
+    content: '';
+    position: absolute;
+    left: -{size//3}px;
+    top: -{size//4}px;
+    width: 0px;
+    height: 0px;
+    border-left: {size//3}px solid transparent;
+    border-right: {size//3}px solid transparent;
+    border-bottom: {size//2}px solid {shape['color']};
+    transform: rotate(-70deg);
+}}
+
+#{shape_id}:after {{
+    content: '';
+    position: absolute;
+    left: -{size//3}px;
+    top: {size//8}px;
+    width: 0px;
+    height: 0px;
+    border-left: {size//3}px solid transparent;
+    border-right: {size//3}px solid transparent;
+    border-bottom: {size//2}px solid {shape['color']};
+    transform: rotate(70deg);
+}}
+"""
+
+    def cross_css(self, shape_id, shape):
+        size = shape['size']
+        thickness = size // 4
+        return f"""
+#{shape_id} {{
+    position: relative;
+    width: {thickness}px;
+    height: {size}px;
+    background: {shape['color']};
+}}
+
+#{shape_id}:after {{
+    content: '';
+    position: absolute;
+    top: {size//2 - thickness//2}px;
+    left: -{size//2 - thickness//2}px;
+    width: {size}px;
+    height: {thickness}px;
+    background: {shape['color']};
+}}
+"""
+
+    def arrow_css(self, shape_id, shape):
+        size = shape['size']
+        return f"""
+#{shape_id} {{
+    width: {size}px;
+    height: {size//2}px;
+    background: {shape['color']};
+    position: relative;
+}}
+
+#{shape_id}:after {{
+    content: '';
+    position: absolute;
+    left: 100%;
+    top: 0;
+    width: 0;
+    height: 0;
+    border-top: {size//4}px solid transparent;
+    border-bottom: {size//4}px solid transparent;
+    border-left: {size//3}px solid {shape['color']};
+}}
+"""
+
+    def make_variant(self, seed, variant_id):
+        edit = seed.edit()
+
+        num_shapes = random.randint(40, 100)
+        shapes = self.generate_shapes(num_shapes)
+
+        main_container = seed.index.find('div', 'exampleslibrary-mobile') or seed.index.find('body')
+
+        if main_container:
+            shapes_html = ''.join(self.make_shape_html(edit, shape) for shape in shapes)
+            edit.prepend(main_container, edit.tag('div', shapes_html, id=f'geometric-bg-{variant_id}',
+                                                  **{'class': 'geometric-background'}))
+
+        shapes_css = BACKGROUND_CSS + ''.join(self.get_shape_css(shape) for shape in shapes)
+        return 'visible_geometric', edit.render(), seed.css + "\n\n" + shapes_css
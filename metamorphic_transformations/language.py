@@ -0,0 +1,138 @@
+import os
+from .asset_index import get_font_index
+from .seed import VariantGenerator, font_face_css
+from .translation import MEMO_PATH, TranslationBackend, TranslationMemo, Translator, make_backend
+
+LANGUAGES = {
+    'korean': 'ko',
+    'japanese': 'ja',
+    'hindi': 'hi',
+    'greek': 'el',
+    'thai': 'th',
+    'arabic': 'ar'
+}
+FONTS_PATH = '/Users/promachowdhury/fonts/'
+FALLBACK_FONTS = {
+    'ko': 'font-family: "Malgun Gothic", "Apple SD Gothic Neo", sans-serif;',
+    'ja': 'font-family: "Yu Gothic", "Hiragino Sans", sans-serif;',
+    'hi': 'font-family: "Mangal", "Lohit Devanagari", sans-serif;',
+    'el': 'font-family: "Times New Roman", serif;',
+    'th': 'font-family: "Leelawadee UI", "Tahoma", sans-serif;',
+    'ar': 'font-family: "Tahoma", "Microsoft Sans Serif", sans-serif; direction: rtl; text-align: right;'
+}
+RTL_CSS = """
+.lang-{lang_code} {{
+    direction: rtl;
+    text-align: right;
+}}
+
+.lang-{lang_code} .exampleslibrary-mobile {{
+    direction: rtl;
+}}
+"""
+
+
+class SimpleHTMLTranslator(VariantGenerator):
+    name = 'language'
+    title = 'Mobile App -'
+
+    def __init__(self, fonts_path=FONTS_PATH, languages=None, backend='google', dictionary_path=None,
+                 memo_path=MEMO_PATH):
+        if not isinstance(backend, TranslationBackend):
+            backend = make_backend(backend, dictionary_path)
+        self.languages = {language: LANGUAGES[language] for language in (languages or LANGUAGES)}
+        self.fonts_path = fonts_path
+        self.font_css = {}
+        self.font_folders = {language: os.path.join(fonts_path, language) + '/' for language in self.languages}
+        self.translator = Translator(backend, TranslationMemo(memo_path))
+
+    def extract_all_text(self, index):
+        text_elements = []
+        for string_id, string in enumerate(index.strings):
+            text = string.text.strip()
+            if (text and
+                    len(text) > 1 and
+                    not text.isdigit() and
+                    string.parent_name not in ['script', 'style', 'meta', 'title']):
+                text_elements.append((string_id, text))
+        return text_elements
+
+    def translate_text(self, text, target_lang):
+        return self.translator.translate_all([text], target_lang)[0]
+
+    def get_font_css(self, language):
+        font_css = self.font_css.get(language)
+        if font_css is None:
+            font_css = self.font_css[language] = self.make_font_css(language)
+        return font_css
+
+    def make_font_css(self, language):
+        lang_code = self.languages[language]
+        font_folder = self.font_folders[language]
+        font_files = get_font_index(self.fonts_path).get(language, [])
+        if not font_files:
+            return self.get_fallback_fonts(language)
+
+        font_css = ''.join(font_face_css(f"{language}-font-{i+1}", f"{font_folder}{font_file}")
+                           for i, font_file in enumerate(font_files))
+        font_family_list = ', '.join([f"'{language}-font-{i+1}'" for i in range(len(font_files))])
+        font_css += f"""
+.lang-{lang_code} {{
+    font-family: {font_family_list}, sans-serif;
+}}
+
+.lang-{lang_code} * {{
+    font-family: {font_family_list}, sans-serif;
+}}
+"""
+        if lang_code == 'ar':
+            font_css += RTL_CSS.format(lang_code=lang_code)
+        return font_css
+
+    def get_fallback_fonts(self, language):
+        lang_code = self.languages[language]
+        font_rule = FALLBACK_FONTS.get(lang_code, 'font-family: sans-serif;')
+        css = f"""
+.lang-{lang_code} {{
+    {font_rule}
+}}
+
+.lang-{lang_code} * {{
+    {font_rule}
+}}
+"""
+        if lang_code == 'ar':
+            css += RTL_CSS.format(lang_code=lang_code)
+        return css
+
+    def variant_ids(self, num_variants):
+        return range(min(num_variants, len(self.languages)))
+
+    def variant_name(self, variant_id, variant_type):
+        return f"index_{variant_type}"
+
+    def variant_title(self, variant_id, variant_type):
+        return f"{self.title} {variant_type.title()}"
+
+    def variant_lang(self, variant_type):
+        return self.languages[variant_type]
+
+    def make_variant(self, seed, variant_id):
+        language = list(self.languages)[variant_id]
+        return (language,) + self.create_language_variant(seed, language)
+
+    def create_language_variant(self, seed, language):
+        lang_code = self.languages[language]
+        edit = seed.edit()
+
+        text_elements = self.extract_all_text(seed.index)
+        translations = self.translator.translate_all([text for _, text in text_elements], lang_code)
+        for (string_id, original_text), translated_text in zip(text_elements, translations):
+            if translated_text != original_text:
+                edit.replace_string(string_id, translated_text)
+
+        main_container = seed.index.find('div', 'exampleslibrary-mobile')
+        if main_container:
+            edit.set_attribute(main_container, 'class', main_container.classes + [f'lang-{lang_code}'])
+
+        return edit.render(), seed.css + "\n\n" + self.get_font_css(language)
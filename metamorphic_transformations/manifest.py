@@ -0,0 +1,106 @@
+import json
+import os
+import time
+from shared.file_index import atomic_write_bytes
+from shared.manifest import append_entries, content_hash, manifest_entry
+
+
+def sync_files(paths):
+    for path in paths:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+class ManifestWriter:
+    def __init__(self, manifest_path, batch_size=32):
+        self.manifest_path = manifest_path
+        self.batch_size = batch_size
+        self.pending = []
+
+    def add(self, path, content, seed, group, stage):
+        entry = manifest_entry(self.manifest_path, path, seed, group, stage, content_hash(content))
+        self.pending.append((path, entry))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        # Entries only ever point at files that are already on disk.
+        sync_files(path for path, _ in self.pending)
+        append_entries(self.manifest_path, [entry for _, entry in self.pending])
+        self.pending = []
+
+
+class ManifestReader:
+    def __init__(self, manifest_path, cursor_path=None):
+        self.manifest_path = manifest_path
+        self.cursor_path = cursor_path
+        self.base_dir = os.path.dirname(os.path.abspath(manifest_path))
+        self.offset = self.load_cursor()
+
+    def load_cursor(self):
+        if self.cursor_path is None:
+            return 0
+        try:
+            with open(self.cursor_path, encoding='utf-8') as f:
+                return int(json.load(f)['offset'])
+        except (OSError, ValueError, KeyError, TypeError):
+            return 0
+
+    def commit(self):
+        if self.cursor_path is None:
+            return
+        atomic_write_bytes(self.cursor_path, json.dumps({'offset': self.offset}).encode('utf-8'))
+
+    def resolve(self, entry):
+        return os.path.normpath(os.path.join(self.base_dir, entry['path']))
+
+    def read(self):
+        try:
+            with open(self.manifest_path, 'rb') as f:
+                f.seek(0, os.SEEK_END)
+                if f.tell() < self.offset:
+                    self.offset = 0
+                f.seek(self.offset)
+                data = f.read()
+        except FileNotFoundError:
+            return []
+
+        # Only complete lines are consumed; a line still being appended is picked up on the next read.
+        complete = data[:data.rfind(b'\n') + 1]
+        self.offset += len(complete)
+        entries = []
+        for line in complete.splitlines():
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                continue
+        return entries
+
+    def follow(self, poll_interval=0.5, idle_timeout=None):
+        idle_since = time.monotonic()
+        while True:
+            entries = self.read()
+            if entries:
+                yield entries
+                idle_since = time.monotonic()
+            elif idle_timeout is not None and time.monotonic() - idle_since >= idle_timeout:
+                return
+            else:
+                time.sleep(poll_interval)
+
+
+def consume(manifest_path, handle, cursor_path=None, follow=False, poll_interval=0.5, idle_timeout=None):
+    reader = ManifestReader(manifest_path, cursor_path)
+    batches = reader.follow(poll_interval, idle_timeout) if follow else iter([reader.read()])
+    consumed = 0
+    for entries in batches:
+        for entry in entries:
+            handle(reader.resolve(entry), entry)
+            consumed += 1
+        reader.commit()
+    return consumed
@@ -0,0 +1,128 @@
+import json
+import os
+import sys
+import tempfile
+from shared.manifest import manifest_entry
+from .manifest import ManifestReader, ManifestWriter, consume
+
+
+def make_files(root, names):
+    paths = []
+    for name in names:
+        path = os.path.join(root, 'variants_1', f"{name}.html")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(f"<p>{name}</p>")
+        paths.append(path)
+    return paths
+
+
+def write_entries(manifest_path, paths, batch_size=4):
+    writer = ManifestWriter(manifest_path, batch_size)
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            writer.add(path, f.read(), 'variants_1/index', 'variants_1', 'check')
+    writer.flush()
+
+
+def entry_line(manifest_path, path):
+    return (json.dumps(manifest_entry(manifest_path, path, 'variants_1/index', 'variants_1', 'check')) + '\n').encode()
+
+
+def names(entries):
+    return [os.path.splitext(os.path.basename(entry['path']))[0] for entry in entries]
+
+
+def check_truncated_tail(root):
+    manifest_path = os.path.join(root, 'manifest.jsonl')
+    write_entries(manifest_path, make_files(root, ['a0', 'a1', 'a2']))
+    # A writer that died mid-append leaves a line without its newline.
+    with open(manifest_path, 'ab') as f:
+        f.write(entry_line(manifest_path, make_files(root, ['lost'])[0])[:40])
+    write_entries(manifest_path, make_files(root, ['a3', 'a4']))
+
+    with open(manifest_path, 'rb') as f:
+        lines = f.read().split(b'\n')
+    if lines[-1] != b'':
+        return "manifest does not end with a newline"
+    try:
+        entries = [json.loads(line) for line in lines[:-1]]
+    except ValueError:
+        return "partial line was not removed"
+    if names(entries) != ['a0', 'a1', 'a2', 'a3', 'a4']:
+        return f"unexpected entries {names(entries)}"
+    return None
+
+
+def check_half_written_line(root):
+    manifest_path = os.path.join(root, 'manifest.jsonl')
+    write_entries(manifest_path, make_files(root, ['b0', 'b1']))
+    reader = ManifestReader(manifest_path)
+    if names(reader.read()) != ['b0', 'b1']:
+        return "complete entries were not read"
+
+    line = entry_line(manifest_path, make_files(root, ['b2'])[0])
+    with open(manifest_path, 'ab') as f:
+        f.write(line[:len(line) // 2])
+    if reader.read():
+        return "half-written line was consumed"
+    if reader.offset != os.path.getsize(manifest_path) - len(line) // 2:
+        return "cursor moved into the half-written line"
+
+    with open(manifest_path, 'ab') as f:
+        f.write(line[len(line) // 2:])
+    if names(reader.read()) != ['b2']:
+        return "completed line was not read exactly once"
+    if reader.read():
+        return "entries were read twice"
+    return None
+
+
+def check_resume(root):
+    manifest_path = os.path.join(root, 'manifest.jsonl')
+    cursor_path = os.path.join(root, 'manifest.cursor')
+    expected, seen = [], []
+    for round_idx in range(5):
+        batch = [f"c{round_idx}_{i}" for i in range(round_idx + 1)]
+        write_entries(manifest_path, make_files(root, batch), batch_size=2)
+        expected.extend(batch)
+        # Every round is a fresh consumer resuming from the last committed cursor.
+        consume(manifest_path, lambda path, entry: seen.append(entry), cursor_path=cursor_path)
+    if names(seen) != expected:
+        lost = sorted(set(expected) - set(names(seen)))
+        repeated = sorted({name for name in names(seen) if names(seen).count(name) > 1})
+        return f"lost {lost}, repeated {repeated}"
+
+    partial = entry_line(manifest_path, make_files(root, ['c_tail'])[0])
+    with open(manifest_path, 'ab') as f:
+        f.write(partial[:20])
+    if consume(manifest_path, lambda path, entry: seen.append(entry), cursor_path=cursor_path):
+        return "consumed a half-written line after resuming"
+    write_entries(manifest_path, make_files(root, ['c_last']))
+    consume(manifest_path, lambda path, entry: seen.append(entry), cursor_path=cursor_path)
+    if names(seen) != expected + ['c_last']:
+        return f"unexpected entries after repair {names(seen)[len(expected):]}"
+    return None
+
+
+CHECKS = [
+    ('truncated last line is repaired by append_entries', check_truncated_tail),
+    ('half-written line is not consumed', check_half_written_line),
+    ('resumed reader neither loses nor repeats entries', check_resume),
+]
+
+
+def main():
+    failed = 0
+    for description, check in CHECKS:
+        with tempfile.TemporaryDirectory() as root:
+            error = check(root)
+        print(f"{'ok' if error is None else 'FAILED'}: {description}" + (f" ({error})" if error else ''))
+        failed += error is not None
+    print(f"{len(CHECKS) - failed}/{len(CHECKS)} checks passed")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import os
+import random
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from tqdm import tqdm
+from .component_occlusion import HTMLComponentOverlapGenerator
+from .emotive_font import FontVariantGenerator
+from .geometric_background import GeometricBackgroundGenerator
+from .language import SimpleHTMLTranslator
+from .manifest import ManifestWriter
+from .seed import Seed, find_seeds, render_page
+from .text_emoji import EmojiInjectionGenerator
+from .text_overlap import AllTextOverlapGenerator
+
+TRANSFORMATIONS = {
+    generator.name: generator for generator in (
+        HTMLComponentOverlapGenerator, FontVariantGenerator, GeometricBackgroundGenerator,
+        SimpleHTMLTranslator, EmojiInjectionGenerator, AllTextOverlapGenerator,
+    )
+}
+
+_generators = {}
+
+
+def task_seed(base_seed, seed_id, name):
+    return zlib.crc32(f"{base_seed}:{seed_id}:{name}".encode())
+
+
+def build_generators(names, options=None, base_seed=0):
+    options = options or {}
+    random.seed(base_seed)
+    _generators.clear()
+    for name in names:
+        _generators[name] = TRANSFORMATIONS[name](**options.get(name, {}))
+    return _generators
+
+
+def variant_path(output_dir, generator, seed, variant):
+    file_name = variant['name'] if seed.name == 'index' else f"{seed.name}_{variant['name']}"
+    return os.path.join(output_dir, generator.name, seed.group, f"{file_name}.html")
+
+
+def transform_seed(task):
+    seed = Seed.load(task['html_path'], task['css_path'])
+    summary = {'seed': seed.id, 'html_path': task['html_path'], 'variants': {}, 'failed': {}}
+    manifest = ManifestWriter(task['manifest']) if task.get('manifest') else None
+
+    for name in task['transformations']:
+        generator = _generators[name]
+        random.seed(task_seed(task['base_seed'], seed.id, name))
+        written = failed = 0
+        directories = set()
+        for variant in generator.generate(seed, task['num_variants']):
+            if variant['status'] != 'success':
+                failed += 1
+                continue
+            path = variant_path(task['output_dir'], generator, seed, variant)
+            directory = os.path.dirname(path)
+            if directory not in directories:
+                os.makedirs(directory, exist_ok=True)
+                directories.add(directory)
+            page = render_page(variant)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(page)
+            if manifest is not None:
+                manifest.add(path, page, seed.id, seed.group, f"transform/{name}")
+            written += 1
+        summary['variants'][name] = written
+        summary['failed'][name] = failed
+    if manifest is not None:
+        manifest.flush()
+    return summary
+
+
+def build_tasks(inputs, output_dir, transformations, num_variants, base_seed, manifest=None):
+    for html_path, css_path in find_seeds(inputs):
+        yield {
+            'html_path': html_path,
+            'css_path': css_path,
+            'output_dir': output_dir,
+            'transformations': transformations,
+            'num_variants': num_variants,
+            'base_seed': base_seed,
+            'manifest': manifest,
+        }
+
+
+def run_pipeline(inputs, output_dir, transformations=None, num_variants=200, workers=1, base_seed=0,
+                 options=None, progress=True, manifest=None):
+    transformations = list(transformations or TRANSFORMATIONS)
+    unknown = [name for name in transformations if name not in TRANSFORMATIONS]
+    if unknown:
+        raise ValueError(f"Unknown transformations: {', '.join(unknown)}")
+
+    build_generators(transformations, options, base_seed)
+    tasks = build_tasks(inputs, output_dir, transformations, num_variants, base_seed, manifest)
+    summaries = []
+    if workers == 1:
+        for task in tqdm(tasks, disable=not progress):
+            try:
+                summaries.append(transform_seed(task))
+            except Exception as e:
+                summaries.append(failed_task(task, e))
+        return sorted(summaries, key=lambda s: s['html_path'])
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=build_generators,
+                             initargs=(transformations, options, base_seed)) as pool:
+        pending = {}
+        with tqdm(disable=not progress) as bar:
+            for task in tasks:
+                pending[pool.submit(transform_seed, task)] = task
+                if len(pending) >= 2 * workers:
+                    summaries.append(collect(pending, bar))
+            while pending:
+                summaries.append(collect(pending, bar))
+    return sorted(summaries, key=lambda s: s['html_path'])
+
+
+def collect(pending, bar):
+    future = next(as_completed(pending))
+    task = pending.pop(future)
+    bar.update()
+    try:
+        return future.result()
+    except Exception as e:
+        return failed_task(task, e)
+
+
+def failed_task(task, error):
+    print(f"Transforming {task['html_path']} failed: {error}")
+    return {'html_path': task['html_path'], 'error': str(error)}
@@ -0,0 +1,178 @@
+import copy
+import os
+import re
+from bs4 import BeautifulSoup
+from .dom_index import DOMIndex, HTMLEdit
+
+CACHE_DIR = os.environ.get('CSS_FUZZER_CACHE_DIR',
+                           os.path.join(os.path.expanduser('~'), '.cache', 'css_fuzzer'))
+TEXT_SELECTORS = ['.time', '.headline', '.label-text', '.title', '.date', '.label-text11', '.label-text12']
+FONT_EXTENSIONS = ('.woff2', '.woff', '.ttf', '.otf')
+FONT_FORMATS = {'.woff2': 'woff2', '.woff': 'woff', '.ttf': 'truetype', '.otf': 'opentype'}
+GROUP_PATTERN = re.compile(r'variants_\d+$')
+BODY_PATTERN = re.compile(r'<body[^>]*>(.*)</body>', re.S)
+
+
+class Seed:
+    def __init__(self, html, css='', name='index', group='variants_1'):
+        self.html = html
+        self.css = css
+        self.name = name
+        self.group = group
+        self.id = f"{group}/{name}"
+        self.cache = {}
+        self.soup = BeautifulSoup(html, 'html.parser')
+
+    @classmethod
+    def load(cls, html_path, css_path=None):
+        with open(html_path, encoding='utf-8') as f:
+            html = f.read()
+        css = ''
+        if css_path is not None:
+            with open(css_path, encoding='utf-8') as f:
+                css = f.read()
+        name = os.path.splitext(os.path.basename(html_path))[0]
+        return cls(html, css, name, seed_group(html_path))
+
+    @property
+    def index(self):
+        index = self.cache.get('index')
+        if index is None:
+            index = self.cache['index'] = DOMIndex(self.soup)
+        return index
+
+    def edit(self):
+        return HTMLEdit(self.index)
+
+    def parse(self):
+        soup = BeautifulSoup('', 'html.parser')
+        for child in self.soup.contents:
+            soup.append(copy.copy(child))
+        return soup
+
+
+def seed_group(html_path):
+    directory = os.path.dirname(os.path.abspath(html_path))
+    while directory and directory != os.path.dirname(directory):
+        if GROUP_PATTERN.match(os.path.basename(directory)):
+            return os.path.basename(directory)
+        directory = os.path.dirname(directory)
+    return os.path.basename(os.path.dirname(os.path.abspath(html_path)))
+
+
+def seed_stylesheet(html_path):
+    stem = os.path.splitext(html_path)[0]
+    for css_path in (stem + '.css', os.path.join(os.path.dirname(html_path), 'index.css')):
+        if os.path.isfile(css_path):
+            return css_path
+    return None
+
+
+def find_seeds(paths):
+    for path in paths:
+        if os.path.isfile(path):
+            yield path, seed_stylesheet(path)
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for file in sorted(files):
+                if file.lower().endswith('.html'):
+                    html_path = os.path.join(root, file)
+                    yield html_path, seed_stylesheet(html_path)
+
+
+def find_text_elements(index, selectors=TEXT_SELECTORS):
+    return [element for selector in selectors for element in index.select(selector) if element.text]
+
+
+def get_font_files(font_folder):
+    try:
+        return [file for file in os.listdir(font_folder) if file.lower().endswith(FONT_EXTENSIONS)]
+    except OSError:
+        return []
+
+
+def font_format(font_file):
+    return FONT_FORMATS.get(os.path.splitext(font_file)[1].lower(), 'truetype')
+
+
+def font_face_css(family_name, font_path):
+    return f"""
+@font-face {{
+    font-family: '{family_name}';
+    src: url('{font_path}') format('{font_format(font_path)}');
+    font-display: swap;
+}}
+"""
+
+
+def body_content(html):
+    match = BODY_PATTERN.search(html)
+    return match.group(1) if match else html
+
+
+def render_page(variant):
+    lang = f' lang="{variant["lang"]}"' if variant.get('lang') else ''
+    return f"""<!DOCTYPE html>
+<html{lang}>
+<head>
+    <meta charset="utf-8">
+    <meta name="viewport" content="initial-scale=1, width=device-width">
+    <title>{variant['title']}</title>
+    <style>
+{variant['css']}
+    </style>
+</head>
+<body>
+{body_content(variant['html'])}
+</body>
+</html>"""
+
+
+class VariantGenerator:
+    name = None
+    prefix = None
+    title = None
+
+    def make_variant(self, seed, variant_id):
+        raise NotImplementedError
+
+    def variant_ids(self, num_variants):
+        return range(num_variants)
+
+    def variant_name(self, variant_id, variant_type):
+        return f"{self.prefix}_{variant_id:03d}_{variant_type}"
+
+    def variant_title(self, variant_id, variant_type):
+        return f"{self.title} {variant_id} ({variant_type})"
+
+    def variant_lang(self, variant_type):
+        return None
+
+    def generate(self, seed, num_variants=200):
+        for variant_id in self.variant_ids(num_variants):
+            try:
+                variant_type, variant_html, variant_css = self.make_variant(seed, variant_id)
+            except Exception as e:
+                yield {'id': variant_id, 'status': 'failed', 'error': str(e)}
+                continue
+            yield {
+                'id': variant_id,
+                'type': variant_type,
+                'name': self.variant_name(variant_id, variant_type),
+                'title': self.variant_title(variant_id, variant_type),
+                'html': variant_html,
+                'css': variant_css,
+                'lang': self.variant_lang(variant_type),
+                'status': 'success'
+            }
+
+    def create_variants(self, html_content, css_content, num_variants=200):
+        return list(self.generate(Seed(html_content, css_content), num_variants))
+
+    def save_files(self, variants, output_dir):
+        os.makedirs(output_dir, exist_ok=True)
+        for variant in variants:
+            if variant['status'] == 'success':
+                with open(os.path.join(output_dir, f"{variant['name']}.html"), 'w', encoding='utf-8') as f:
+                    f.write(render_page(variant))
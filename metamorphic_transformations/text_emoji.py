@@ -0,0 +1,140 @@
+import random
+from .asset_index import get_emoji_index
+from .seed import VariantGenerator, find_text_elements, font_face_css
+
+try:
+    import emoji
+except ImportError:
+    emoji = None
+
+EMOJI_FONT_PATH = '/Users/promachowdhury/fonts/NotoColorEmoji.ttf'
+EMOJI_CATEGORIES = {
+    'faces': (['face', 'smile', 'grin', 'joy', 'laugh', 'wink', 'cry', 'angry'], 50),
+    'animals': (['dog', 'cat', 'bird', 'fish', 'bear', 'lion', 'tiger', 'monkey'], 30),
+    'objects': (['ball', 'car', 'phone', 'computer', 'book', 'music', 'game'], 30),
+    'food': (['food', 'pizza', 'burger', 'cake', 'coffee', 'drink', 'fruit'], 30),
+    'hearts': (['heart', 'love'], 20),
+}
+
+
+class EmojiInjectionGenerator(VariantGenerator):
+    name = 'text_emoji'
+    prefix = 'emoji'
+    title = 'Emoji Variant'
+
+    def __init__(self, font_path=EMOJI_FONT_PATH):
+        if emoji is None:
+            raise ImportError("emoji is required for the text_emoji transformation")
+        self.font_path = font_path
+        self.css = {}
+        self.setup_emojis()
+
+    def setup_emojis(self):
+        index = get_emoji_index(EMOJI_CATEGORIES)
+        all_emojis = index['emojis']
+
+        self.emoji_cats = dict(index['categories'])
+        self.emoji_cats['random'] = random.sample(all_emojis, min(100, len(all_emojis)))
+
+    def inject_emoji(self, text, emoji_char, position='random'):
+        if len(text) <= 1:
+            return text + emoji_char
+
+        if position == 'start':
+            return emoji_char + text
+        elif position == 'end':
+            return text + emoji_char
+        elif position == 'middle':
+            mid_point = len(text) // 2
+            return text[:mid_point] + emoji_char + text[mid_point:]
+        elif position == 'random':
+            insert_pos = random.randint(1, len(text))
+            return text[:insert_pos] + emoji_char + text[insert_pos:]
+        elif position == 'between_words':
+            words = text.split(' ')
+            if len(words) > 1:
+                word_pos = random.randint(1, len(words))
+                words.insert(word_pos, emoji_char)
+                return ' '.join(words)
+            return text + emoji_char
+        return text + emoji_char
+
+    def emoji_css(self, class_name):
+        css = self.css.get(class_name)
+        if css is None:
+            css = self.css[class_name] = font_face_css('NotoColorEmoji', self.font_path) + f"""
+.{class_name} {{
+    font-family: 'NotoColorEmoji', sans-serif !important;
+}}
+"""
+        return css
+
+    def make_variant(self, seed, variant_id):
+        if variant_id % 3 == 0:
+            return ('single_emoji',) + self.make_single_variant(seed, variant_id)
+        if variant_id % 3 == 1:
+            return ('multi_emoji',) + self.make_multi_variant(seed, variant_id)
+        return ('emoji_chaos',) + self.make_chaos_variant(seed, variant_id)
+
+    def replace_text(self, edit, element, class_name, new_text):
+        edit.set_text(element, new_text)
+        edit.set_attribute(element, 'class', edit.get(element, 'class', []) + [class_name])
+
+    def make_single_variant(self, seed, variant_id):
+        edit = seed.edit()
+        text_elements = find_text_elements(seed.index)
+
+        if len(text_elements) == 0:
+            return seed.html, seed.css
+
+        category = random.choice(list(self.emoji_cats.keys()))
+        position_style = random.choice(['random', 'middle', 'between_words', 'start', 'end'])
+
+        for element in text_elements:
+            emoji_char = random.choice(self.emoji_cats[category])
+            new_text = self.inject_emoji(element.text, emoji_char, position_style)
+            self.replace_text(edit, element, 'emoji-text', new_text)
+
+        return edit.render(), seed.css + "\n\n" + self.emoji_css('emoji-text')
+
+    def make_multi_variant(self, seed, variant_id):
+        edit = seed.edit()
+        text_elements = find_text_elements(seed.index)
+
+        if len(text_elements) == 0:
+            return seed.html, seed.css
+
+        for element in text_elements:
+            num_emojis = random.randint(2, 4)
+            selected_emojis = []
+            for _ in range(num_emojis):
+                category = random.choice(list(self.emoji_cats.keys()))
+                selected_emojis.append(random.choice(self.emoji_cats[category]))
+
+            modified_text = element.text
+            for emoji_char in selected_emojis:
+                position = random.choice(['random', 'middle', 'between_words'])
+                modified_text = self.inject_emoji(modified_text, emoji_char, position)
+            self.replace_text(edit, element, 'multi-emoji-text', modified_text)
+
+        return edit.render(), seed.css + "\n\n" + self.emoji_css('multi-emoji-text')
+
+    def make_chaos_variant(self, seed, variant_id):
+        edit = seed.edit()
+        text_elements = find_text_elements(seed.index)
+
+        if len(text_elements) == 0:
+            return seed.html, seed.css
+
+        all_emojis = self.emoji_cats['random']
+
+        for element in text_elements:
+            modified_text = element.text
+            num_injections = random.randint(1, 6)
+            for _ in range(num_injections):
+                emoji_char = random.choice(all_emojis)
+                position = random.choice(['random', 'start', 'middle', 'end', 'between_words'])
+                modified_text = self.inject_emoji(modified_text, emoji_char, position)
+            self.replace_text(edit, element, 'chaos-emoji-text', modified_text)
+
+        return edit.render(), seed.css + "\n\n" + self.emoji_css('chaos-emoji-text')
@@ -0,0 +1,146 @@
+import random
+from .dom_index import escape_text
+from .seed import VariantGenerator, find_text_elements
+
+
+class AllTextOverlapGenerator(VariantGenerator):
+    name = 'text_overlap'
+    prefix = 'all_overlap'
+    title = 'All Text Overlap Variant'
+
+    def __init__(self):
+        self.offsets = [
+            {'x': 1, 'y': 1}, {'x': 2, 'y': 0}, {'x': 0, 'y': 2},
+            {'x': -1, 'y': 1}, {'x': 1, 'y': -1}, {'x': 3, 'y': 1},
+            {'x': 0, 'y': 3}, {'x': 2, 'y': 2}, {'x': -2, 'y': 0},
+            {'x': 4, 'y': 0}, {'x': 0, 'y': 4}, {'x': -3, 'y': -1}
+        ]
+
+        self.colors = [
+            '#ff0000', '#00ff00', '#0000ff', '#ff00ff', '#ffff00',
+            '#00ffff', '#ffa500', '#800080', '#ffc0cb', '#90ee90'
+        ]
+
+    def make_variant(self, seed, variant_id):
+        if variant_id % 4 == 0:
+            return ('extreme',) + self.make_extreme_variant(seed, variant_id)
+        return ('normal',) + self.make_overlap_variant(seed, variant_id)
+
+    def make_overlap_variant(self, seed, variant_id):
+        edit = seed.edit()
+        text_elements = find_text_elements(seed.index)
+
+        if len(text_elements) == 0:
+            return seed.html, seed.css
+
+        overlap_css = ""
+
+        for elem_idx, target_element in enumerate(text_elements):
+            original_text = target_element.text
+
+            container_id = f"container-{variant_id}-{elem_idx}"
+            original_id = f"original-{variant_id}-{elem_idx}"
+
+            edit.set_attribute(target_element, 'id', original_id)
+            edit.wrap(target_element, 'span', id=container_id, style="position: relative; display: inline-block;")
+
+            num_overlaps = random.randint(1, 5)
+
+            for overlap_idx in range(num_overlaps):
+                overlap_id = f"overlap-{variant_id}-{elem_idx}-{overlap_idx}"
+                offset = random.choice(self.offsets)
+                color = random.choice(self.colors)
+                opacity = random.uniform(0.6, 0.95)
+
+                edit.insert_after(target_element, edit.tag('span', escape_text(original_text), id=overlap_id))
+
+                overlap_css += f"""
+#{overlap_id} {{
+    position: absolute !important;
+    top: {offset['y'] + overlap_idx}px !important;
+    left: {offset['x'] + overlap_idx}px !important;
+    z-index: {100 + overlap_idx} !important;
+    color: {color} !important;
+    opacity: {opacity} !important;
+    font-weight: bold !important;
+    pointer-events: none !important;
+    white-space: nowrap !important;
+}}
+"""
+
+        overlap_css += f"""
+[id^="container-{variant_id}-"] {{
+    position: relative !important;
+    display: inline-block !important;
+}}
+
+[id^="original-{variant_id}-"] {{
+    position: relative !important;
+    z-index: 1 !important;
+}}
+"""
+
+        return edit.render(), seed.css + "\n\n" + overlap_css
+
+    def make_extreme_variant(self, seed, variant_id):
+        edit = seed.edit()
+        text_elements = find_text_elements(seed.index)
+
+        if len(text_elements) == 0:
+            return seed.html, seed.css
+
+        overlap_css = ""
+
+        for elem_idx, target_element in enumerate(text_elements):
+            original_text = target_element.text
+
+            container_id = f"extreme-container-{variant_id}-{elem_idx}"
+            original_id = f"extreme-original-{variant_id}-{elem_idx}"
+
+            edit.set_attribute(target_element, 'id', original_id)
+            edit.wrap(target_element, 'span', id=container_id, style="position: relative; display: inline-block;")
+
+            num_overlaps = random.randint(3, 8)
+
+            for overlap_idx in range(num_overlaps):
+                overlap_id = f"extreme-overlap-{variant_id}-{elem_idx}-{overlap_idx}"
+
+                offset_x = random.randint(-5, 5)
+                offset_y = random.randint(-5, 5)
+                color = random.choice(self.colors)
+                opacity = random.uniform(0.4, 0.9)
+
+                font_weight = random.choice(['normal', 'bold', '600', '700'])
+                font_size_mod = random.uniform(0.9, 1.2)
+
+                edit.insert_after(target_element, edit.tag('span', escape_text(original_text), id=overlap_id))
+
+                overlap_css += f"""
+#{overlap_id} {{
+    position: absolute !important;
+    top: {offset_y}px !important;
+    left: {offset_x}px !important;
+    z-index: {200 + overlap_idx} !important;
+    color: {color} !important;
+    opacity: {opacity} !important;
+    font-weight: {font_weight} !important;
+    font-size: {font_size_mod}em !important;
+    pointer-events: none !important;
+    white-space: nowrap !important;
+    text-shadow: 1px 1px 2px rgba(0,0,0,0.3) !important;
+}}
+"""
+
+        overlap_css += f"""
+[id^="extreme-container-{variant_id}-"] {{
+    position: relative !important;
+    display: inline-block !important;
+}}
+
+[id^="extreme-original-{variant_id}-"] {{
+    position: relative !important;
+    z-index: 1 !important;
+}}
+"""
+
+        return edit.render(), seed.css + "\n\n" + overlap_css
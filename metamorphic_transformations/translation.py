@@ -0,0 +1,172 @@
+import json
+import os
+import re
+import sqlite3
+from .seed import CACHE_DIR
+
+try:
+    from deep_translator import GoogleTranslator
+except ImportError:
+    GoogleTranslator = None
+
+MEMO_PATH = os.path.join(CACHE_DIR, 'translations.sqlite')
+NUMBER_PATTERN = re.compile(r'\b\d+(?:[.:]\d+)*\b')
+PLACEHOLDER_PATTERN = re.compile(r'__NUM\d+__')
+
+
+def preserve_numbers(text):
+    numbers_map = {}
+    modified_text = text
+    for i, match in enumerate(NUMBER_PATTERN.finditer(text)):
+        number = match.group()
+        placeholder = f"__NUM{i}__"
+        numbers_map[placeholder] = number
+        modified_text = modified_text.replace(number, placeholder, 1)
+    return modified_text, numbers_map
+
+
+def restore_numbers(translated_text, numbers_map):
+    for placeholder, number in numbers_map.items():
+        translated_text = translated_text.replace(placeholder, number)
+    return translated_text
+
+
+class TranslationBackend:
+    name = None
+
+    def translate_batch(self, texts, target_lang):
+        raise NotImplementedError
+
+
+class GoogleBackend(TranslationBackend):
+    name = 'google'
+
+    def __init__(self):
+        if GoogleTranslator is None:
+            raise ImportError("deep-translator is required for the google translation backend")
+        self.translators = {}
+
+    def translate_batch(self, texts, target_lang):
+        translator = self.translators.get(target_lang)
+        if translator is None:
+            translator = self.translators[target_lang] = GoogleTranslator(source='auto', target=target_lang)
+        try:
+            return translator.translate_batch(list(texts))
+        except Exception:
+            return [None] * len(texts)
+
+
+class DictionaryBackend(TranslationBackend):
+    name = 'dictionary'
+
+    def __init__(self, path=None, entries=None):
+        self.entries = entries or {}
+        if path is not None:
+            with open(path, encoding='utf-8') as f:
+                self.entries = json.load(f)
+
+    def translate_batch(self, texts, target_lang):
+        entries = self.entries.get(target_lang, {})
+        return [entries.get(text) for text in texts]
+
+
+BACKENDS = {backend.name: backend for backend in (GoogleBackend, DictionaryBackend)}
+
+
+def make_backend(name, dictionary_path=None):
+    if name == 'dictionary':
+        return DictionaryBackend(dictionary_path)
+    return BACKENDS[name]()
+
+
+class TranslationMemo:
+    def __init__(self, path=MEMO_PATH):
+        self.path = path
+        self.cache = {}
+        self.connection = None
+
+    def connect(self):
+        if self.connection is None and self.path is not None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self.connection = sqlite3.connect(self.path, timeout=600, isolation_level=None)
+            self.connection.execute('PRAGMA journal_mode=WAL')
+            self.connection.execute('CREATE TABLE IF NOT EXISTS translations ('
+                                    'text TEXT NOT NULL, lang TEXT NOT NULL, translation TEXT NOT NULL, '
+                                    'PRIMARY KEY (text, lang))')
+        return self.connection
+
+    def lookup(self, texts, lang, found):
+        missing = []
+        for text in texts:
+            translation = self.cache.get((text, lang))
+            if translation is None:
+                missing.append(text)
+            else:
+                found[text] = translation
+
+        connection = self.connect()
+        if missing and connection is not None:
+            for start in range(0, len(missing), 500):
+                chunk = missing[start:start + 500]
+                rows = connection.execute(
+                    f"SELECT text, translation FROM translations WHERE lang = ? AND text IN "
+                    f"({','.join('?' * len(chunk))})", [lang, *chunk])
+                for text, translation in rows:
+                    self.cache[(text, lang)] = found[text] = translation
+        return [text for text in missing if text not in found]
+
+    def get_or_translate(self, texts, lang, translate_batch):
+        found = {}
+        missing = self.lookup(texts, lang, found)
+        if not missing:
+            return found
+
+        connection = self.connect()
+        if connection is None:
+            fresh = {text: translation for text, translation in zip(missing, translate_batch(missing, lang))
+                     if translation}
+            self.cache.update(((text, lang), translation) for text, translation in fresh.items())
+            found.update(fresh)
+            return found
+
+        # Hold the write lock while translating so concurrent workers never translate the same text twice.
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            missing = self.lookup(missing, lang, found)
+            fresh = {text: translation for text, translation in zip(missing, translate_batch(missing, lang))
+                     if translation} if missing else {}
+            connection.executemany('INSERT OR REPLACE INTO translations VALUES (?, ?, ?)',
+                                   [(text, lang, translation) for text, translation in fresh.items()])
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        self.cache.update(((text, lang), translation) for text, translation in fresh.items())
+        found.update(fresh)
+        return found
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+class Translator:
+    def __init__(self, backend, memo=None):
+        self.backend = backend
+        self.memo = memo or TranslationMemo(None)
+
+    def translate_all(self, texts, target_lang):
+        keys = []
+        numbers = []
+        for text in texts:
+            key, numbers_map = preserve_numbers(text)
+            keys.append(key)
+            numbers.append(numbers_map)
+
+        pending = [key for key in dict.fromkeys(keys) if len(PLACEHOLDER_PATTERN.sub('', key).strip()) >= 2]
+        translations = self.memo.get_or_translate(pending, target_lang, self.backend.translate_batch)
+
+        return [restore_numbers(translations[key], numbers_map) if key in translations else text
+                for text, key, numbers_map in zip(texts, keys, numbers)]
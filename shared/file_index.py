@@ -0,0 +1,56 @@
+import json
+import os
+import tempfile
+
+
+def atomic_write_bytes(path, data):
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp_')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def path_signature(paths):
+    signature = {}
+    for path in paths:
+        try:
+            st = os.stat(path)
+            signature[path] = [st.st_mtime_ns, st.st_size]
+        except OSError:
+            signature[path] = None
+    return signature
+
+
+def read_index(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_index(path, index):
+    try:
+        atomic_write_bytes(path, json.dumps(index).encode('utf-8'))
+    except OSError:
+        pass
+
+
+def load_index(path, key, scan):
+    index = read_index(path)
+    if index is not None and index.get('key') == key and index.get('signature'):
+        if path_signature(index['signature']) == index['signature']:
+            return index['entries']
+
+    entries, paths = scan()
+    write_index(path, {'key': key, 'signature': path_signature(dict.fromkeys(paths)), 'entries': entries})
+    return entries
@@ -0,0 +1,88 @@
+import hashlib
+import json
+import os
+import time
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DIMENSIONS_PATH = os.path.join(ROOT_DIR, 'html-to-image-rendering', 'variant_dimensions.json')
+
+_dimensions = {}
+
+
+def variant_dimensions():
+    # Read on first use; without the renderer checkout every viewport is None.
+    if DIMENSIONS_PATH not in _dimensions:
+        try:
+            with open(DIMENSIONS_PATH, encoding='utf-8') as f:
+                _dimensions[DIMENSIONS_PATH] = json.load(f)
+        except FileNotFoundError:
+            _dimensions[DIMENSIONS_PATH] = {}
+    return _dimensions[DIMENSIONS_PATH]
+
+
+def viewport(group):
+    return variant_dimensions().get(group)
+
+
+def content_hash(content):
+    return hashlib.sha256(content.encode('utf-8') if isinstance(content, str) else content).hexdigest()
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def manifest_entry(manifest_path, path, seed, group, stage, sha256=None):
+    return {
+        'path': os.path.relpath(path, os.path.dirname(os.path.abspath(manifest_path))),
+        'seed': seed,
+        'stage': stage,
+        'viewport': viewport(group),
+        'sha256': sha256,
+        'time': time.time(),
+    }
+
+
+def repair_tail(f):
+    f.seek(0, os.SEEK_END)
+    end = f.tell()
+    position = end
+    while position > 0:
+        start = max(0, position - (1 << 16))
+        f.seek(start)
+        chunk = f.read(position - start)
+        newline = chunk.rfind(b'\n')
+        if newline != -1:
+            position = start + newline + 1
+            break
+        position = start
+    if position != end:
+        f.truncate(position)
+
+
+def append_entries(manifest_path, entries):
+    data = ''.join(json.dumps(entry) + '\n' for entry in entries).encode('utf-8')
+    directory = os.path.dirname(manifest_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(manifest_path, 'a+b') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            # A writer that crashed mid-append leaves a partial last line; drop it before appending.
+            repair_tail(f)
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)